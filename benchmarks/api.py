@@ -0,0 +1,563 @@
+"""Latency and throughput of every HTTP route, in-process and over uvicorn.
+
+`run` seeds `--users` users with `--todos` todos each in a fresh SQLite
+file per mode, then sends `--requests` requests to each route with
+`--concurrency` requests in flight. In-process mode drives the ASGI app
+directly. Server mode goes through a real uvicorn process. Routes that hash
+passwords are capped at `--hash-requests` requests, since argon2 dominates
+them. `todo.list` and `todo.search` move the page by one row for each
+repeat of a user's request, so they measure the query rather than the
+response cache; `todo.list_cached` repeats one page and measures the cache.
+`todo.stream` and `todo.ws` time opening an event stream, and only
+run in server mode: the in-process transport waits for the whole body.
+Each route reports p50/p95/p99 latency, mean latency, throughput and
+error count, and `--output` saves the report as JSON.
+
+`compare` checks a report against a baseline and exits with status 1 when
+any route's p95 grew, or its throughput dropped, by more than
+`--threshold`.
+
+    python -m benchmarks.api run --mode both --output results.json
+    python -m benchmarks.api compare baseline.json results.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from http import HTTPStatus
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from websockets.asyncio.client import connect as websocket_connect
+from websockets.exceptions import InvalidStatus
+
+from benchmarks.server import running_server
+from todo_teste.app import app
+from todo_teste.database import create_database_engine, get_session, open_session
+from todo_teste.hashing import get_password_hash
+from todo_teste.models import Todo, TodoStatus, TodoVersion, User, table_registry
+from todo_teste.pagination import encode_cursor
+from todo_teste.security import create_access_token
+from todo_teste.settings import Settings
+from todo_teste.stats import rebuild_todo_stats
+
+PASSWORD = 'bench-password'
+BATCH = 10
+
+
+@dataclass
+class Fixture:
+    """Seeded users, their tokens, and todo ids not yet claimed by a request."""
+
+    database_url: str
+    users: list[tuple[int, str]]
+    todo_ids: dict[int, list[int]]
+    headers: dict[int, dict] = field(default_factory=dict)
+    watermarks: dict[int, str] = field(default_factory=dict)
+
+    def user(self, i: int) -> tuple[int, str]:
+        return self.users[i % len(self.users)]
+
+    def auth(self, user_id: int) -> dict:
+        return self.headers[user_id]
+
+    def claim(self, user_id: int, count: int = 1) -> list[int]:
+        # Requests that update or delete todos each get ids of their own.
+        ids = self.todo_ids[user_id]
+        claimed, self.todo_ids[user_id] = ids[:count], ids[count:]
+        return claimed
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[int, Fixture], tuple[str, str, dict]]
+    hashes_passwords: bool = False
+    prepare: Callable[[Fixture], None] | None = None
+    # Sends a request built by `build` and returns its status code.
+    send: Callable | None = None
+    server_only: bool = False
+
+
+def _todo_json(i: int) -> dict:
+    return {'title': f'todo {i}', 'description': 'benchmark', 'status': 'pending'}
+
+
+def _list(i, fx):
+    user_id, _ = fx.user(i)
+    params = {'offset': i // len(fx.users)}
+    return 'GET', '/todo/', {'params': params, 'headers': fx.auth(user_id)}
+
+
+def _list_cached(i, fx):
+    user_id, _ = fx.user(i)
+    return 'GET', '/todo/', {'headers': fx.auth(user_id)}
+
+
+def _search(i, fx):
+    user_id, _ = fx.user(i)
+    params = {'title': f'todo {i % 50}', 'offset': i // len(fx.users)}
+    return 'GET', '/todo/', {'params': params, 'headers': fx.auth(user_id)}
+
+
+def _read(i, fx):
+    user_id, _ = fx.user(i)
+    todo_id = fx.todo_ids[user_id][i % len(fx.todo_ids[user_id])]
+    return 'GET', f'/todo/{todo_id}', {'headers': fx.auth(user_id)}
+
+
+def _export(i, fx):
+    user_id, _ = fx.user(i)
+    return 'GET', '/todo/export', {'headers': fx.auth(user_id)}
+
+
+def _changes(i, fx):
+    user_id, _ = fx.user(i)
+    return 'GET', '/todo/changes', {'headers': fx.auth(user_id)}
+
+
+def _current_watermarks(fx):
+    # `todo.changes_since` polls from each user's latest watermark, as a
+    # client that is already in sync does.
+    engine = create_engine(fx.database_url)
+    with engine.connect() as connection:
+        versions = dict(
+            connection.execute(select(TodoVersion.user_id, TodoVersion.version)).all()
+        )
+    engine.dispose()
+    fx.watermarks = {
+        user_id: encode_cursor({'version': versions.get(user_id, 0)})
+        for user_id, _ in fx.users
+    }
+
+
+def _changes_since(i, fx):
+    user_id, _ = fx.user(i)
+    return (
+        'GET',
+        '/todo/changes',
+        {'params': {'since': fx.watermarks[user_id]}, 'headers': fx.auth(user_id)},
+    )
+
+
+def _stats(i, fx):
+    user_id, _ = fx.user(i)
+    return 'GET', '/todo/stats', {'headers': fx.auth(user_id)}
+
+
+def _stream(i, fx):
+    user_id, _ = fx.user(i)
+    return 'GET', '/todo/stream', {'headers': fx.auth(user_id)}
+
+
+async def _open_stream(client, method, url, kwargs) -> int:
+    # The stream never ends: wait for its first bytes, then hang up.
+    async with client.stream(method, url, **kwargs) as response:
+        if response.status_code == HTTPStatus.OK:
+            await anext(response.aiter_raw())
+    return response.status_code
+
+
+def _websocket(i, fx):
+    user_id, _ = fx.user(i)
+    _, token = fx.auth(user_id)['Authorization'].split()
+    return 'GET', '/todo/ws', {'params': {'token': token}}
+
+
+async def _open_websocket(client, method, url, kwargs) -> int:
+    websocket_url = client.base_url.copy_with(scheme='ws').join(url)
+    try:
+        async with websocket_connect(
+            str(websocket_url.copy_merge_params(kwargs['params']))
+        ):
+            pass
+    except InvalidStatus as exc:
+        return exc.response.status_code
+    return HTTPStatus.SWITCHING_PROTOCOLS
+
+
+def _create(i, fx):
+    user_id, _ = fx.user(i)
+    return 'POST', '/todo/', {'json': _todo_json(i), 'headers': fx.auth(user_id)}
+
+
+def _import(i, fx):
+    user_id, _ = fx.user(i)
+    body = ''.join(json.dumps(_todo_json(i + n)) + '\n' for n in range(BATCH))
+    return 'POST', '/todo/import', {'content': body, 'headers': fx.auth(user_id)}
+
+
+def _bulk_create(i, fx):
+    user_id, _ = fx.user(i)
+    todos = [_todo_json(i + n) for n in range(BATCH)]
+    return 'POST', '/todo/bulk', {'json': {'todos': todos}, 'headers': fx.auth(user_id)}
+
+
+def _update(i, fx):
+    user_id, _ = fx.user(i)
+    [todo_id] = fx.claim(user_id)
+    return (
+        'PUT',
+        f'/todo/{todo_id}',
+        {'json': {**_todo_json(i), 'status': 'done'}, 'headers': fx.auth(user_id)},
+    )
+
+
+def _bulk_update(i, fx):
+    user_id, _ = fx.user(i)
+    todos = [
+        {**_todo_json(i), 'id': todo_id, 'status': 'running'}
+        for todo_id in fx.claim(user_id, BATCH)
+    ]
+    return (
+        'PATCH',
+        '/todo/bulk',
+        {'json': {'todos': todos}, 'headers': fx.auth(user_id)},
+    )
+
+
+def _delete(i, fx):
+    user_id, _ = fx.user(i)
+    [todo_id] = fx.claim(user_id)
+    return 'DELETE', f'/todo/{todo_id}', {'headers': fx.auth(user_id)}
+
+
+def _bulk_delete(i, fx):
+    user_id, _ = fx.user(i)
+    ids = fx.claim(user_id, BATCH)
+    return (
+        'DELETE',
+        '/todo/bulk',
+        {'json': {'ids': ids}, 'headers': fx.auth(user_id)},
+    )
+
+
+def _users_list(i, fx):
+    return 'GET', '/users/', {}
+
+
+def _users_create(i, fx):
+    user = {
+        'username': f'new{i}',
+        'email': f'new{i}@bench.com',
+        'password': PASSWORD,
+    }
+    return 'POST', '/users/', {'json': user}
+
+
+def _login(i, fx):
+    _, email = fx.user(i)
+    return (
+        'POST',
+        '/auth/token',
+        {'data': {'username': email, 'password': PASSWORD}},
+    )
+
+
+def _users_update(i, fx):
+    user_id, email = fx.user(i)
+    username = email.split('@')[0]
+    user = {'username': username, 'email': email, 'password': PASSWORD}
+    return 'PUT', f'/users/{user_id}', {'json': user, 'headers': fx.auth(user_id)}
+
+
+def _created_users(fx):
+    # Users made by `users.create` are the ones `users.delete` removes.
+    engine = create_engine(fx.database_url)
+    with engine.connect() as connection:
+        fx.users = list(
+            connection.execute(
+                select(User.id, User.email).where(User.email.like('new%'))
+            )
+        )
+    engine.dispose()
+    fx.headers.update({
+        user_id: {'Authorization': f'Bearer {create_access_token({"sub": email})}'}
+        for user_id, email in fx.users
+    })
+
+
+def _users_delete(i, fx):
+    user_id, _ = fx.users[i]
+    return 'DELETE', f'/users/{user_id}', {'headers': fx.auth(user_id)}
+
+
+# Reads first, then writes, then deletes, so every request finds its data.
+SCENARIOS = [
+    Scenario('users.list', _users_list),
+    Scenario('todo.list', _list),
+    Scenario('todo.list_cached', _list_cached),
+    Scenario('todo.search', _search),
+    Scenario('todo.read', _read),
+    Scenario('todo.export', _export),
+    Scenario('todo.changes', _changes),
+    Scenario('todo.changes_since', _changes_since, prepare=_current_watermarks),
+    Scenario('todo.stats', _stats),
+    Scenario('todo.stream', _stream, send=_open_stream, server_only=True),
+    Scenario('todo.ws', _websocket, send=_open_websocket, server_only=True),
+    Scenario('auth.token', _login, hashes_passwords=True),
+    Scenario('todo.create', _create),
+    Scenario('todo.bulk_create', _bulk_create),
+    Scenario('todo.import', _import),
+    Scenario('todo.update', _update),
+    Scenario('todo.bulk_update', _bulk_update),
+    Scenario('users.update', _users_update, hashes_passwords=True),
+    Scenario('users.create', _users_create, hashes_passwords=True),
+    Scenario('todo.delete', _delete),
+    Scenario('todo.bulk_delete', _bulk_delete),
+    Scenario('users.delete', _users_delete, prepare=_created_users),
+]
+
+
+async def _rebuild_stats(engine):
+    async with open_session(engine) as session:
+        await rebuild_todo_stats(session)
+        await session.commit()
+
+
+def seed(database_url: str, users: int, todos: int) -> Fixture:
+    engine = create_engine(database_url)
+    table_registry.metadata.create_all(engine)
+    password = get_password_hash(PASSWORD)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(User),
+            [
+                {
+                    'username': f'user{n}',
+                    'email': f'user{n}@bench.com',
+                    'password': password,
+                }
+                for n in range(users)
+            ],
+        )
+        seeded = list(connection.execute(select(User.id, User.email)))
+        connection.execute(
+            insert(Todo),
+            [
+                {
+                    'title': f'todo {n}',
+                    'description': 'benchmark',
+                    'status': TodoStatus.pending,
+                    'user_id': user_id,
+                }
+                for user_id, _ in seeded
+                for n in range(todos)
+            ],
+        )
+        rows = connection.execute(select(Todo.user_id, Todo.id).order_by(Todo.id))
+        todo_ids = {user_id: [] for user_id, _ in seeded}
+        for user_id, todo_id in rows:
+            todo_ids[user_id].append(todo_id)
+    # The todos were inserted directly, so fill in their stats as well.
+    asyncio.run(_rebuild_stats(engine))
+    engine.dispose()
+
+    return Fixture(
+        database_url=database_url,
+        users=seeded,
+        todo_ids=todo_ids,
+        headers={
+            user_id: {'Authorization': f'Bearer {create_access_token({"sub": email})}'}
+            for user_id, email in seeded
+        },
+    )
+
+
+def summarize(samples: list[float], errors: int, seconds: float) -> dict:
+    if len(samples) > 1:
+        cuts = statistics.quantiles(samples, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = samples[0]
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'p50_ms': round(p50 * 1000, 3),
+        'p95_ms': round(p95 * 1000, 3),
+        'p99_ms': round(p99 * 1000, 3),
+        'mean_ms': round(statistics.fmean(samples) * 1000, 3),
+        'throughput_rps': round(len(samples) / seconds, 1),
+    }
+
+
+async def _request(client, method, url, kwargs) -> int:
+    response = await client.request(method, url, **kwargs)
+    return response.status_code
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, requests: list, concurrency: int, send=_request
+) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples, errors = [], 0
+
+    async def timed(method, url, kwargs):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            status_code = await send(client, method, url, kwargs)
+            samples.append(time.perf_counter() - start)
+            if status_code >= 400:  # noqa: PLR2004
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed(*request) for request in requests))
+    return summarize(samples, errors, time.perf_counter() - start)
+
+
+async def run_all(
+    client: httpx.AsyncClient, fixture: Fixture, args, server: bool
+) -> dict:
+    results = {}
+    for scenario in SCENARIOS:
+        if scenario.server_only and not server:
+            continue
+        if scenario.prepare is not None:
+            scenario.prepare(fixture)
+
+        count = args.hash_requests if scenario.hashes_passwords else args.requests
+        if scenario.name == 'users.delete':
+            count = len(fixture.users)
+        if not count:
+            continue
+
+        requests = [scenario.build(i, fixture) for i in range(count)]
+        results[scenario.name] = await run_scenario(
+            client, requests, args.concurrency, scenario.send or _request
+        )
+        print(f'  {scenario.name}: {results[scenario.name]}', file=sys.stderr)
+    return results
+
+
+async def run_inprocess(fixture: Fixture, args) -> dict:
+    engine = create_database_engine(Settings(DATABASE_URL=fixture.database_url))
+
+    async def get_session_override():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    # Every scenario comes from one client address; measure the routes, not
+    # the limiter's 429s.
+    app.dependency_overrides[app.state.rate_limiter] = lambda: None
+    try:
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(
+            transport=transport, base_url='http://bench'
+        ) as client:
+            return await run_all(client, fixture, args, server=False)
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+
+async def run_server(fixture: Fixture, args) -> dict:
+    with running_server(fixture.database_url) as (url, _):
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=url, limits=limits, timeout=None
+        ) as client:
+            return await run_all(client, fixture, args, server=True)
+
+
+def run(args) -> int:
+    modes = ['inprocess', 'server'] if args.mode == 'both' else [args.mode]
+    report = {
+        'meta': {
+            'timestamp': datetime.now(UTC).isoformat(),
+            'python': platform.python_version(),
+            'users': args.users,
+            'todos': args.todos,
+            'requests': args.requests,
+            'hash_requests': args.hash_requests,
+            'concurrency': args.concurrency,
+        },
+        'results': {},
+    }
+
+    # Each request that updates or deletes todos claims its own, so seed enough.
+    per_user = -(-args.requests // args.users)
+    todos = max(args.todos, per_user * (2 + 2 * BATCH) + 1)
+
+    for mode in modes:
+        print(f'{mode}:', file=sys.stderr)
+        with tempfile.TemporaryDirectory() as directory:
+            fixture = seed(f'sqlite:///{Path(directory) / "api.db"}', args.users, todos)
+            runner = run_inprocess if mode == 'inprocess' else run_server
+            report['results'][mode] = asyncio.run(runner(fixture, args))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+    print(output)
+    return 0
+
+
+def compare(args) -> int:
+    baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+    current = json.loads(Path(args.current).read_text(encoding='utf-8'))
+
+    regressions = []
+    for mode, routes in current['results'].items():
+        for route, result in routes.items():
+            base = baseline['results'].get(mode, {}).get(route)
+            if base is None:
+                continue
+
+            p95_change = result['p95_ms'] / base['p95_ms'] - 1
+            throughput_change = result['throughput_rps'] / base['throughput_rps'] - 1
+            regressed = (
+                p95_change > args.threshold or -throughput_change > args.threshold
+            )
+            print(
+                f'{"REGRESSION" if regressed else "ok":<10} {mode:<9} {route:<18} '
+                f'p95 {base["p95_ms"]:>9.2f} -> {result["p95_ms"]:>9.2f} ms '
+                f'({p95_change:+.0%})  '
+                f'throughput {base["throughput_rps"]:>8.1f} -> '
+                f'{result["throughput_rps"]:>8.1f} rps ({throughput_change:+.0%})'
+            )
+            if regressed:
+                regressions.append((mode, route))
+
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='benchmark every route')
+    run_parser.add_argument(
+        '--mode', choices=['inprocess', 'server', 'both'], default='both'
+    )
+    run_parser.add_argument('--users', type=int, default=10)
+    run_parser.add_argument('--todos', type=int, default=100)
+    run_parser.add_argument('--requests', type=int, default=200)
+    run_parser.add_argument('--hash-requests', type=int, default=20)
+    run_parser.add_argument('--concurrency', type=int, default=10)
+    run_parser.add_argument('--output')
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser('compare', help='compare two reports')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.2)
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Throughput and server memory of `POST /todo/import` for a large upload.
+
+Writes `--rows` todos to a temporary NDJSON or CSV file, starts the app
+under uvicorn against a temporary SQLite database and streams the file to
+the import route. Peak RSS is the server's high-water mark (VmHWM, Linux
+only), read before and after the upload so the report shows how much the
+import itself added on top of a warmed-up process.
+
+    python -m benchmarks.import_todos --rows 1000000 --format ndjson
+"""
+
+import argparse
+import csv
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine, insert
+
+from benchmarks.server import peak_rss_mb, running_server
+from todo_teste.models import User, table_registry
+from todo_teste.security import create_access_token
+
+CHUNK_SIZE = 64 * 1024
+
+
+def write_upload(path: Path, rows: int, transfer_format: str) -> None:
+    with path.open('w', newline='', encoding='utf-8') as upload:
+        if transfer_format == 'csv':
+            writer = csv.writer(upload)
+            writer.writerow(['title', 'description', 'status'])
+            writer.writerows(
+                [f'todo {i}', 'imported, with a comma', 'pending'] for i in range(rows)
+            )
+            return
+
+        for i in range(rows):
+            upload.write(
+                json.dumps({
+                    'title': f'todo {i}',
+                    'description': 'imported',
+                    'status': 'pending',
+                })
+                + '\n'
+            )
+
+
+def _chunks(path: Path):
+    with path.open('rb') as upload:
+        while chunk := upload.read(CHUNK_SIZE):
+            yield chunk
+
+
+def upload_to_server(
+    database_url: str, token: str, upload: Path, transfer_format: str
+) -> tuple[dict, float, float | None, float | None]:
+    with running_server(database_url) as (url, server):
+        rss_before = peak_rss_mb(server.pid)
+
+        start = time.perf_counter()
+        response = httpx.post(
+            f'{url}/todo/import',
+            params={'format': transfer_format},
+            content=_chunks(upload),
+            headers={'Authorization': f'Bearer {token}'},
+            timeout=None,
+        )
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        rss_after = peak_rss_mb(server.pid)
+
+    return response.json(), elapsed, rss_before, rss_after
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--format', choices=['ndjson', 'csv'], default='ndjson')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f'sqlite:///{Path(directory) / "import.db"}'
+        engine = create_engine(database_url)
+        table_registry.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(
+                insert(User),
+                {'username': 'bench', 'email': 'bench@test.com', 'password': 'x'},
+            )
+        engine.dispose()
+        token = create_access_token(data={'sub': 'bench@test.com'})
+
+        upload = Path(directory) / f'todos.{args.format}'
+        write_upload(upload, args.rows, args.format)
+
+        result, seconds, rss_before, rss_after = upload_to_server(
+            database_url, token, upload, args.format
+        )
+        report = {
+            'format': args.format,
+            'rows': args.rows,
+            'upload_mb': round(upload.stat().st_size / 2**20, 1),
+            'imported': result['imported'],
+            'failed': result['failed'],
+            'seconds': round(seconds, 2),
+            'rows_per_second': round(result['imported'] / seconds, 1),
+            'peak_rss_mb_before': rss_before,
+            'peak_rss_mb_after': rss_after,
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Cost of a shallow vs. deep `GET /todo/` page, offset vs. cursor.
+
+Seeds one user with `--todos` rows in a temporary SQLite file, then times
+page 1 and page `--page` of size `--limit` through the app in-process. Each
+repeat starts a row further on, so none is served from the response cache;
+`cached` times the same deep page repeated, which the cache answers.
+
+    python -m benchmarks.pagination --todos 200000 --page 1000
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from todo_teste.app import app
+from todo_teste.database import create_database_engine, get_session
+from todo_teste.hashing import get_password_hash
+from todo_teste.models import Todo, TodoStatus, User, table_registry
+from todo_teste.pagination import encode_cursor
+from todo_teste.settings import Settings
+
+
+def seed(database_url: str, todos: int) -> None:
+    engine = create_engine(database_url)
+    table_registry.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(User),
+            {
+                'username': 'bench',
+                'email': 'bench@test.com',
+                'password': get_password_hash('bench'),
+            },
+        )
+        connection.execute(
+            insert(Todo),
+            [
+                {
+                    'title': f'todo {i}',
+                    'description': 'benchmark',
+                    'status': TodoStatus.pending,
+                    'user_id': 1,
+                }
+                for i in range(todos)
+            ],
+        )
+    engine.dispose()
+
+
+def timed_get(client, pages: list[dict], headers: dict) -> float:
+    samples = []
+    for params in pages:
+        start = time.perf_counter()
+        response = client.get('/todo/', params=params, headers=headers)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--todos', type=int, default=200_000)
+    parser.add_argument('--page', type=int, default=1000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f'sqlite:///{Path(directory) / "pagination.db"}'
+        seed(database_url, args.todos)
+        engine = create_database_engine(Settings(DATABASE_URL=database_url))
+
+        async def get_session_override():
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                yield session
+
+        app.dependency_overrides[get_session] = get_session_override
+        with TestClient(app) as client:
+            token = client.post(
+                '/auth/token', data={'username': 'bench@test.com', 'password': 'bench'}
+            ).json()['access_token']
+            headers = {'Authorization': f'Bearer {token}'}
+
+            # Ids are sequential from 1, so the row before a page is known.
+            skipped = (args.page - 1) * args.limit
+            shifts = range(args.repeat)
+            report = {
+                'offset': {
+                    'page_1_ms': timed_get(
+                        client,
+                        [{'limit': args.limit, 'offset': n} for n in shifts],
+                        headers,
+                    ),
+                    f'page_{args.page}_ms': timed_get(
+                        client,
+                        [{'limit': args.limit, 'offset': skipped + n} for n in shifts],
+                        headers,
+                    ),
+                },
+                'cursor': {
+                    'page_1_ms': timed_get(
+                        client,
+                        [
+                            {'limit': args.limit, 'cursor': encode_cursor({'id': n})}
+                            for n in shifts
+                        ],
+                        headers,
+                    ),
+                    f'page_{args.page}_ms': timed_get(
+                        client,
+                        [
+                            {
+                                'limit': args.limit,
+                                'cursor': encode_cursor({'id': skipped + n}),
+                            }
+                            for n in shifts
+                        ],
+                        headers,
+                    ),
+                },
+                'cached': {
+                    f'page_{args.page}_ms': timed_get(
+                        client,
+                        [{'limit': args.limit, 'offset': skipped}] * args.repeat,
+                        headers,
+                    ),
+                },
+            }
+        app.dependency_overrides.clear()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
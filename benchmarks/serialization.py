@@ -0,0 +1,126 @@
+"""Per-row cost of serializing a `GET /todo/` body, by serialization path.
+
+Compares three ways of turning `--sizes` todos into the list response:
+
+* `response_model`: ORM objects through FastAPI's `response_model`
+  validation and `JSONResponse`, as `list_todo` originally did;
+* `pydantic`: ORM objects validated into `TodoList` and dumped with
+  `model_dump_json`;
+* `orjson`: row tuples dumped by `todo_list_json`, as `list_todo` does now.
+
+The three outputs are checked to be byte-identical before timing.
+
+    python -m benchmarks.serialization --sizes 100 1000 10000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from todo_teste.models import Todo, TodoStatus
+from todo_teste.schemas import TodoList
+from todo_teste.serialization import TODO_FIELDS, todo_list_json
+
+RESPONSE_FIELD = create_model_field(name='Response_list_todo', type_=TodoList)
+
+
+def make_rows(size: int) -> list[tuple]:
+    start = datetime(2024, 1, 1)
+    return [
+        (
+            f'todo {i}',
+            'some description',
+            TodoStatus.done if i % 2 else TodoStatus.pending,
+            i + 1,
+            start + timedelta(minutes=i),
+            start + timedelta(minutes=i, microseconds=i),
+            start + timedelta(hours=i) if i % 2 else None,
+        )
+        for i in range(size)
+    ]
+
+
+def make_todos(rows: list[tuple]) -> list[Todo]:
+    todos = []
+    for row in rows:
+        values = dict(zip(TODO_FIELDS, row))
+        todo = Todo(
+            title=values['title'],
+            description=values['description'],
+            status=values['status'],
+            user_id=1,
+        )
+        for field in ('id', 'created_at', 'updated_at', 'done_at'):
+            setattr(todo, field, values[field])
+        todos.append(todo)
+    return todos
+
+
+def response_model_path(todos: list[Todo]) -> bytes:
+    content = asyncio.run(
+        serialize_response(
+            field=RESPONSE_FIELD,
+            response_content={'todos': todos, 'next_cursor': None},
+        )
+    )
+    return JSONResponse(content).body
+
+
+def pydantic_path(todos: list[Todo]) -> bytes:
+    return (
+        TodoList
+        .model_validate({'todos': todos, 'next_cursor': None}, from_attributes=True)
+        .model_dump_json()
+        .encode()
+    )
+
+
+def orjson_path(rows: list[tuple]) -> bytes:
+    return todo_list_json(rows, None)
+
+
+def best_of(function, argument, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    report = []
+    for size in args.sizes:
+        rows = make_rows(size)
+        todos = make_todos(rows)
+
+        expected = response_model_path(todos)
+        assert pydantic_path(todos) == expected
+        assert orjson_path(rows) == expected
+
+        result = {'rows': size}
+        for name, function, argument in (
+            ('response_model', response_model_path, todos),
+            ('pydantic', pydantic_path, todos),
+            ('orjson', orjson_path, rows),
+        ):
+            seconds = best_of(function, argument, args.repeat)
+            result[f'{name}_us_per_row'] = round(seconds / size * 1e6, 3)
+        report.append(result)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Run the app under a real uvicorn process for end-to-end benchmarks."""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import httpx
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _status_mb(pid: int, field: str) -> float | None:
+    try:
+        status = Path(f'/proc/{pid}/status').read_text(encoding='utf-8')
+    except OSError:
+        return None
+    for line in status.splitlines():
+        if line.startswith(f'{field}:'):
+            return round(int(line.split()[1]) / 1024, 1)
+    return None
+
+
+def rss_mb(pid: int) -> float | None:
+    """`pid`'s resident memory right now (Linux only)."""
+    return _status_mb(pid, 'VmRSS')
+
+
+def peak_rss_mb(pid: int) -> float | None:
+    """High-water mark of `pid`'s resident memory (Linux only)."""
+    return _status_mb(pid, 'VmHWM')
+
+
+def _wait_until_up(url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f'{url}/docs')
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise RuntimeError('uvicorn did not start')
+
+
+@contextmanager
+def running_server(database_url: str, *, timeout: float = 30.0):
+    """Yield `(base_url, process)` for uvicorn serving the app on `database_url`."""
+    port = free_port()
+    url = f'http://127.0.0.1:{port}'
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            '-m',
+            'uvicorn',
+            'todo_teste.app:app',
+            '--port',
+            str(port),
+            '--log-level',
+            'warning',
+        ],
+        env={
+            **os.environ,
+            'DATABASE_URL': database_url,
+            # Benchmarks send every request from one address.
+            'RATE_LIMIT_ENABLED': 'false',
+        },
+    )
+    try:
+        _wait_until_up(url, timeout)
+        yield url, server
+    finally:
+        server.terminate()
+        server.wait()
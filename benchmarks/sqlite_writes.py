@@ -0,0 +1,97 @@
+"""Concurrent write throughput against SQLite, untuned vs. tuned engine.
+
+Each writer thread inserts todos one transaction at a time, the way
+`create_todo` does. The untuned run uses a bare `create_engine(url)`, as
+`database.py` did before pool and PRAGMA settings existed; the tuned run
+uses `create_database_engine` with the defaults from `Settings`.
+
+    python -m benchmarks.sqlite_writes --writers 8 --inserts 200
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from todo_teste.database import create_database_engine
+from todo_teste.models import Todo, TodoStatus, User, table_registry
+from todo_teste.settings import Settings
+
+
+def _writer(engine, user_id: int, inserts: int) -> tuple[int, int]:
+    committed = locked = 0
+    for i in range(inserts):
+        with Session(engine) as session:
+            session.add(
+                Todo(
+                    title=f'todo {i}',
+                    description='benchmark',
+                    status=TodoStatus.pending,
+                    user_id=user_id,
+                )
+            )
+            try:
+                session.commit()
+                committed += 1
+            except OperationalError:
+                locked += 1
+    return committed, locked
+
+
+def run(engine, writers: int, inserts: int) -> dict:
+    table_registry.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = User(username='bench', email='bench@test.com', password='x')
+        session.add(user)
+        session.commit()
+        user_id = user.id
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as executor:
+        results = list(
+            executor.map(lambda _: _writer(engine, user_id, inserts), range(writers))
+        )
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+
+    committed = sum(result[0] for result in results)
+    return {
+        'writers': writers,
+        'committed': committed,
+        'locked_errors': sum(result[1] for result in results),
+        'seconds': round(elapsed, 3),
+        'writes_per_second': round(committed / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--inserts', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        untuned_url = f'sqlite:///{Path(directory) / "untuned.db"}'
+        tuned_url = f'sqlite:///{Path(directory) / "tuned.db"}'
+
+        untuned = create_engine(untuned_url)
+        tuned = create_database_engine(
+            Settings(DATABASE_URL=tuned_url, DATABASE_MODE='sync')
+        )
+
+        report = {
+            'untuned': run(untuned, args.writers, args.inserts),
+            'tuned': run(tuned, args.writers, args.inserts),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
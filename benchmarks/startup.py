@@ -0,0 +1,82 @@
+"""Cold-start cost: importing `todo_teste.app` and building the app.
+
+Each of `--repeat` runs is a fresh `python -X importtime` process that
+imports `todo_teste.app`, then calls `create_app()`. The report gives the
+median import time of `todo_teste.app` alone, of `create_app()` (which
+imports the routers and everything behind them) and of both together,
+plus the `--top` modules with the largest self time in the last run.
+
+    python -m benchmarks.startup --repeat 10 --output startup.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+SCRIPT = """
+import time
+started_at = time.perf_counter()
+import todo_teste.app
+imported_at = time.perf_counter()
+todo_teste.app.create_app()
+built_at = time.perf_counter()
+print((imported_at - started_at) * 1000, (built_at - imported_at) * 1000)
+"""
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """`(module, self_us, cumulative_us)` for each line of `-X importtime`."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix('import time:').split('|')
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def run_once() -> tuple[float, float, list[tuple[str, int, int]]]:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_ms, create_app_ms = map(float, result.stdout.split())
+    return import_ms, create_app_ms, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.repeat)]
+    import_ms = statistics.median(run[0] for run in runs)
+    create_app_ms = statistics.median(run[1] for run in runs)
+    slowest = sorted(runs[-1][2], key=lambda module: module[1], reverse=True)
+
+    report = {
+        'python': sys.version.split()[0],
+        'repeat': args.repeat,
+        'import_ms': round(import_ms, 1),
+        'create_app_ms': round(create_app_ms, 1),
+        'startup_ms': round(import_ms + create_app_ms, 1),
+        'slowest_modules': [
+            {'module': name, 'self_ms': self_us / 1000, 'cumulative_ms': total / 1000}
+            for name, self_us, total in slowest[: args.top]
+        ],
+    }
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Server memory held by idle `GET /todo/stream` connections, and fan-out time.
+
+Starts the app under uvicorn (one worker) against a temporary SQLite
+database, opens `--connections` SSE streams for one user over raw
+sockets, and reads the server's RSS before and after (Linux only). Then
+creates one todo and times how long it takes until every stream has
+received the event.
+
+    python -m benchmarks.streams --connections 10000
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy import create_engine, insert
+
+from benchmarks.server import rss_mb, running_server
+from todo_teste.models import User, table_registry
+from todo_teste.security import create_access_token
+
+BATCH = 500
+
+
+async def open_stream(host: str, port: int, token: str):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(
+        f'GET /todo/stream HTTP/1.1\r\nHost: {host}\r\n'
+        f'Authorization: Bearer {token}\r\nAccept: text/event-stream\r\n\r\n'.encode()
+    )
+    await reader.readuntil(b': connected\n\n')
+    return reader, writer
+
+
+async def wait_for_event(reader):
+    await reader.readuntil(b'data: ')
+
+
+async def run(url: str, token: str, connections: int, pid: int) -> dict:
+    parts = urlsplit(url)
+    rss_before = rss_mb(pid)
+
+    streams = []
+    started_at = time.perf_counter()
+    for start in range(0, connections, BATCH):
+        streams += await asyncio.gather(
+            *(
+                open_stream(parts.hostname, parts.port, token)
+                for _ in range(min(BATCH, connections - start))
+            )
+        )
+    connect_seconds = time.perf_counter() - started_at
+    await asyncio.sleep(1)
+    rss_after = rss_mb(pid)
+
+    async with httpx.AsyncClient(base_url=url) as client:
+        waiting = [asyncio.create_task(wait_for_event(r)) for r, _ in streams]
+        started_at = time.perf_counter()
+        await client.post(
+            '/todo/',
+            headers={'Authorization': f'Bearer {token}'},
+            json={'title': 'fan-out', 'description': 'd', 'status': 'pending'},
+        )
+        await asyncio.gather(*waiting)
+        fan_out_seconds = time.perf_counter() - started_at
+
+    for _, writer in streams:
+        writer.close()
+
+    report = {
+        'connections': connections,
+        'connect_seconds': round(connect_seconds, 2),
+        'rss_mb_before': rss_before,
+        'rss_mb_after': rss_after,
+        'fan_out_seconds': round(fan_out_seconds, 3),
+    }
+    if rss_before is not None and rss_after is not None:
+        report['kb_per_connection'] = round(
+            (rss_after - rss_before) * 1024 / connections, 1
+        )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connections', type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f'sqlite:///{Path(directory) / "streams.db"}'
+        engine = create_engine(database_url)
+        table_registry.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(
+                insert(User),
+                {'username': 'bench', 'email': 'bench@bench.com', 'password': 'x'},
+            )
+        engine.dispose()
+        token = create_access_token(data={'sub': 'bench@bench.com'})
+
+        with running_server(database_url) as (url, server):
+            report = asyncio.run(run(url, token, args.connections, server.pid))
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""busca textual na tabela todo
+
+Revision ID: a74e134bf7b9
+Revises: f7f80cbf3094
+Create Date: 2026-10-18 10:03:17.284915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a74e134bf7b9'
+down_revision: Union[str, None] = 'f7f80cbf3094'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE todo_fts USING fts5("
+            "title, description, content='todo', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            'CREATE TRIGGER todo_fts_ai AFTER INSERT ON todo BEGIN '
+            'INSERT INTO todo_fts(rowid, title, description) '
+            'VALUES (new.id, new.title, new.description); END'
+        )
+        op.execute(
+            'CREATE TRIGGER todo_fts_ad AFTER DELETE ON todo BEGIN '
+            'INSERT INTO todo_fts(todo_fts, rowid, title, description) '
+            "VALUES ('delete', old.id, old.title, old.description); END"
+        )
+        op.execute(
+            'CREATE TRIGGER todo_fts_au AFTER UPDATE OF title, description ON todo '
+            'BEGIN INSERT INTO todo_fts(todo_fts, rowid, title, description) '
+            "VALUES ('delete', old.id, old.title, old.description); "
+            'INSERT INTO todo_fts(rowid, title, description) '
+            'VALUES (new.id, new.title, new.description); END'
+        )
+        op.execute("INSERT INTO todo_fts(todo_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute(
+            'CREATE INDEX ix_todo_title_search ON todo '
+            "USING gin (to_tsvector('simple', title))"
+        )
+        op.execute(
+            'CREATE INDEX ix_todo_description_search ON todo '
+            "USING gin (to_tsvector('simple', description))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS todo_fts_au')
+        op.execute('DROP TRIGGER IF EXISTS todo_fts_ad')
+        op.execute('DROP TRIGGER IF EXISTS todo_fts_ai')
+        op.execute('DROP TABLE IF EXISTS todo_fts')
+    elif dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_todo_description_search')
+        op.execute('DROP INDEX IF EXISTS ix_todo_title_search')
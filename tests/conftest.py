@@ -7,18 +7,33 @@ from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
 
+from todo_teste import instrumentation
 from todo_teste.app import app
-from todo_teste.database import get_session
+from todo_teste.database import ThreadPoolSession, get_session
+from todo_teste.hashing import get_password_hash
 from todo_teste.models import User, table_registry
-from todo_teste.security import get_password_hash
+from todo_teste.replicas import recent_writes
+from todo_teste.response_cache import response_cache
+from todo_teste.security import user_cache
+
+instrumentation.listen()
+# The app shuts the hashing pool down with each TestClient; respawning
+# processes for every test would dominate the suite.
+app.state.hashing_service.executor_kind = 'thread'
 
 
 @pytest.fixture
 def client(session):
     def get_session_override():
-        return session
-
-    with TestClient(app) as client:
+        return ThreadPoolSession(session)
+
+    user_cache.clear()
+    response_cache.backend.clear()
+    recent_writes.clear()
+    app.state.rate_limiter.store.clear()
+    # Requests over their route's `@query_budget` fail the test.
+    budgeted_app = instrumentation.QueryBudgetMiddleware(app, mode='raise')
+    with TestClient(budgeted_app) as client:
         app.dependency_overrides[get_session] = get_session_override
         yield client
 
@@ -34,7 +49,7 @@ def session():
     )
     table_registry.metadata.create_all(engine)
 
-    with Session(engine) as session:
+    with Session(engine, expire_on_commit=False) as session:
         yield session
 
     table_registry.metadata.drop_all(engine)
@@ -0,0 +1,83 @@
+import asyncio
+
+from todo_teste.cache import MemoryCacheBackend, TTLCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries():
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=10, ttl=5, timer=timer)
+
+    cache.set('key', 'value')
+    timer.now = 4.9
+    assert cache.get('key') == 'value'
+
+    timer.now = 5
+    assert cache.get('key') is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3  # noqa: PLR2004
+
+
+def test_ttl_cache_pop():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+
+    assert cache.pop('a') == 1
+    assert cache.pop('a', 'missing') == 'missing'
+
+
+def test_memory_backend_counts_hits_misses_and_evictions():
+    timer = FakeTimer()
+    backend = MemoryCacheBackend(maxsize=2, ttl=5, timer=timer)
+
+    async def scenario():
+        await backend.set(1, 'a', b'a')
+        await backend.set(1, 'b', b'b')
+        await backend.set(2, 'c', b'c')
+        assert await backend.get(1, 'a') is None
+        assert await backend.get(1, 'b') == b'b'
+        timer.now = 5
+        assert await backend.get(1, 'b') is None
+
+    asyncio.run(scenario())
+
+    assert backend.stats() == {
+        'hits': 1,
+        'misses': 2,
+        'evictions': 2,
+        'invalidations': 0,
+        'size': 1,
+    }
+
+
+def test_memory_backend_invalidates_one_namespace():
+    backend = MemoryCacheBackend(maxsize=10, ttl=60)
+
+    async def scenario():
+        await backend.set(1, 'a', b'a')
+        await backend.set(1, 'b', b'b')
+        await backend.set(2, 'a', b'other user')
+        await backend.invalidate(1)
+        return await backend.get(1, 'a'), await backend.get(2, 'a')
+
+    assert asyncio.run(scenario()) == (None, b'other user')
+    assert len(backend) == 1
@@ -1,8 +1,23 @@
+import asyncio
+import re
 from dataclasses import asdict
+from http import HTTPStatus
 
-from sqlalchemy import select
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
 
-from todo_teste.models import User
+from todo_teste.app import app
+from todo_teste.database import (
+    async_database_url,
+    create_database_engine,
+    get_session,
+)
+from todo_teste.hashing import get_password_hash
+from todo_teste.models import Todo, TodoStatus, User, table_registry
+from todo_teste.settings import Settings
 
 
 def test_create_user(session):
@@ -22,3 +37,195 @@ def test_create_user(session):
         'email': 'danielle@test.com',
         'password': 'senha',
     }
+
+
+def test_async_database_url_swaps_driver():
+    assert async_database_url('sqlite:///database.db') == (
+        'sqlite+aiosqlite:///database.db'
+    )
+    assert async_database_url('postgresql://u:p@db/todo') == (
+        'postgresql+asyncpg://u:p@db/todo'
+    )
+    assert async_database_url('postgresql+asyncpg://u:p@db/todo') == (
+        'postgresql+asyncpg://u:p@db/todo'
+    )
+
+
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+def test_engine_applies_sqlite_pragmas(tmp_path, mode):
+    settings = Settings(
+        DATABASE_URL=f'sqlite:///{tmp_path / "pragmas.db"}',
+        DATABASE_MODE=mode,
+        SQLITE_BUSY_TIMEOUT=1234,
+    )
+    engine = create_database_engine(settings)
+    pragmas = 'PRAGMA journal_mode', 'PRAGMA synchronous', 'PRAGMA busy_timeout'
+
+    if mode == 'async':
+
+        async def read_pragmas():
+            async with engine.connect() as connection:
+                return [
+                    (await connection.exec_driver_sql(pragma)).scalar()
+                    for pragma in pragmas
+                ]
+
+        journal_mode, synchronous, busy_timeout = asyncio.run(read_pragmas())
+        pool = engine.sync_engine.pool
+        asyncio.run(engine.dispose())
+    else:
+        with engine.connect() as connection:
+            journal_mode, synchronous, busy_timeout = [
+                connection.exec_driver_sql(pragma).scalar() for pragma in pragmas
+            ]
+        pool = engine.pool
+        engine.dispose()
+
+    assert journal_mode == 'wal'
+    assert synchronous == 1  # NORMAL
+    assert busy_timeout == 1234  # noqa: PLR2004
+    assert pool.size() == settings.DATABASE_POOL_SIZE
+
+
+def test_routes_with_async_session(tmp_path):
+    database_url = f'sqlite:///{tmp_path / "async.db"}'
+    sync_engine = create_engine(database_url)
+    table_registry.metadata.create_all(sync_engine)
+
+    with Session(sync_engine) as session:
+        session.add(
+            User(
+                username='async',
+                email='async@test.com',
+                password=get_password_hash('secret'),
+            )
+        )
+        session.commit()
+
+    async_engine = create_async_engine(async_database_url(database_url))
+
+    async def get_async_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_async_session_override
+    try:
+        with TestClient(app) as client:
+            token = client.post(
+                '/auth/token',
+                data={'username': 'async@test.com', 'password': 'secret'},
+            ).json()['access_token']
+            headers = {'Authorization': f'Bearer {token}'}
+
+            client.post(
+                '/todo',
+                headers=headers,
+                json={'title': 'a', 'description': 'b', 'status': 'pending'},
+            )
+            response = client.get('/todo', headers=headers)
+    finally:
+        app.dependency_overrides.clear()
+        sync_engine.dispose()
+
+    assert response.status_code == HTTPStatus.OK
+    assert [todo['title'] for todo in response.json()['todos']] == ['a']
+
+
+def test_todo_queries_use_user_indexes(session, client, user, token):
+    session.add(
+        Todo(title='t', description='d', status=TodoStatus.done, user_id=user.id)
+    )
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    engine = session.get_bind()
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, *args):
+        if statement.lstrip().startswith('SELECT') and 'FROM todo' in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        client.get('/todo/', headers=headers)
+        client.get('/todo/?status=done', headers=headers)
+        next_cursor = client.get('/todo/?limit=1', headers=headers).json()
+        client.get(f'/todo/?cursor={next_cursor["next_cursor"]}', headers=headers)
+        client.put(
+            '/todo/1',
+            headers=headers,
+            json={'title': 't', 'description': 'd', 'status': 'pending'},
+        )
+        client.delete('/todo/1', headers=headers)
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+    assert statements
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            plan = ' '.join(
+                row.detail
+                for row in connection.exec_driver_sql(
+                    f'EXPLAIN QUERY PLAN {statement}', parameters
+                )
+            )
+            assert 'SCAN todo' not in plan, statement
+            assert any(
+                index in plan
+                for index in (
+                    'ix_todo_user_id_id',
+                    'ix_todo_user_id_status',
+                    'INTEGER PRIMARY KEY',
+                )
+            ), plan
+
+
+@pytest.mark.parametrize(
+    'order',
+    [
+        {'order_by': order_by, 'direction': direction}
+        for order_by in ('created_at', 'updated_at', 'done_at', 'title', 'status')
+        for direction in ('asc', 'desc')
+    ],
+)
+def test_sorted_todo_pages_read_index_order(session, client, user, token, order):
+    session.add_all([
+        Todo(title=title, description='d', status=TodoStatus.done, user_id=user.id)
+        for title in 'abc'
+    ])
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    params = {**order, 'limit': 1}
+    engine = session.get_bind()
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, *args):
+        if statement.lstrip().startswith('SELECT') and re.search(
+            r'\bFROM todo\b(?!_)', statement
+        ):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        cursor = client.get('/todo/', headers=headers, params=params).json()
+        client.get(
+            '/todo/',
+            headers=headers,
+            params={**params, 'cursor': cursor['next_cursor']},
+        )
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+    assert statements
+    index = f'ix_todo_user_id_{order["order_by"]}_id'
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            plan = [
+                row.detail
+                for row in connection.exec_driver_sql(
+                    f'EXPLAIN QUERY PLAN {statement}', parameters
+                )
+            ]
+            assert not any(step.startswith('SCAN todo') for step in plan), plan
+            assert any(index in step for step in plan), plan
+            if order['order_by'] != 'done_at':
+                assert not any('TEMP B-TREE' in step for step in plan), plan
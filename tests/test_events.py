@@ -0,0 +1,135 @@
+import asyncio
+import json
+import signal
+
+import pytest
+from fastapi import status
+from starlette.websockets import WebSocketDisconnect
+
+from todo_teste.events import (
+    Subscription,
+    TodoEvents,
+    close_on_exit_signals,
+    sse_chunks,
+    todo_events,
+)
+
+
+def test_subscription_drops_oldest_when_full():
+    async def scenario():
+        subscription = Subscription(maxsize=2)
+        for message in (b'1', b'2', b'3'):
+            subscription.put(message)
+        subscription.close()
+        return [await subscription.get() for _ in range(3)], subscription.dropped
+
+    assert asyncio.run(scenario()) == ([b'2', b'3', None], 1)
+
+
+def test_events_go_through_the_broker():
+    class Broker:
+        async def start(self, deliver):
+            self.deliver = deliver
+
+        async def publish(self, user_id, message):
+            self.deliver(user_id, message)
+
+        async def stop(self):
+            pass
+
+    async def scenario():
+        events = TodoEvents(queue_size=10, broker=Broker())
+        await events.start()
+        with events.subscribe(1) as first, events.subscribe(1) as second:
+            await events.publish(1, 'deleted', 3, ids=[7])
+            await events.publish(2, 'deleted', 4, ids=[8])
+            assert events.connections() == 2  # noqa: PLR2004
+            return await first.get(), await second.get()
+
+    first, second = asyncio.run(scenario())
+
+    assert first is second
+    assert json.loads(first)['ids'] == [7]
+
+
+def test_sse_sends_events_and_keepalives_until_closed():
+    async def scenario():
+        subscription = Subscription(maxsize=10)
+        subscription.put(b'{"event":"imported"}')
+        chunks = sse_chunks(subscription, keepalive=0.01)
+        received = [await anext(chunks) for _ in range(3)]
+        subscription.close()
+        return received + [chunk async for chunk in chunks]
+
+    assert asyncio.run(scenario()) == [
+        b': connected\n\n',
+        b'data: {"event":"imported"}\n\n',
+        b': keepalive\n\n',
+    ]
+
+
+def test_exit_signal_closes_every_stream():
+    handled = []
+
+    async def scenario():
+        events = TodoEvents(queue_size=10)
+        with (
+            events.subscribe(1) as first,
+            events.subscribe(2) as second,
+            close_on_exit_signals(events),
+        ):
+            signal.raise_signal(signal.SIGTERM)
+            chunks = sse_chunks(second, keepalive=60)
+            return await first.get(), [chunk async for chunk in chunks]
+
+    # Stands in for uvicorn's handler, which must still run.
+    previous = signal.signal(signal.SIGTERM, lambda sig, frame: handled.append(sig))
+    try:
+        assert asyncio.run(scenario()) == (None, [b': connected\n\n'])
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+    assert handled == [signal.SIGTERM]
+    assert signal.getsignal(signal.SIGTERM) is previous
+
+
+def test_websocket_receives_todo_changes(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    with client.websocket_connect(f'/todo/ws?token={token}') as websocket:
+        todo_id = client.post(
+            '/todo/',
+            headers=headers,
+            json={'title': 'pushed', 'description': 'd', 'status': 'pending'},
+        ).json()['id']
+        created = websocket.receive_json()
+
+        client.delete(f'/todo/{todo_id}', headers=headers)
+        deleted = websocket.receive_json()
+
+    assert created['event'] == 'created'
+    assert [todo['title'] for todo in created['todos']] == ['pushed']
+    assert deleted['event'] == 'deleted'
+    assert deleted['ids'] == [todo_id]
+    changes = client.get(
+        '/todo/changes', headers=headers, params={'since': created['watermark']}
+    ).json()
+    assert changes['deleted'] == [todo_id]
+
+
+def test_websocket_rejects_invalid_token(client):
+    with (
+        pytest.raises(WebSocketDisconnect),
+        client.websocket_connect('/todo/ws?token=invalid'),
+    ):
+        pass
+
+
+def test_websocket_closes_when_the_server_shuts_down(client, token):
+    with client.websocket_connect(f'/todo/ws?token={token}') as websocket:
+        websocket.portal.call(todo_events.close_all)
+
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            websocket.receive_json()
+
+    assert disconnect.value.code == status.WS_1001_GOING_AWAY
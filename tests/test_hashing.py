@@ -0,0 +1,67 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from todo_teste.app import app
+from todo_teste.hashing import HashingService
+
+hashing_service = app.state.hashing_service
+
+
+def test_hash_and_verify_on_thread_pool():
+    service = HashingService(executor='thread', workers=1)
+
+    async def run():
+        hashed = await service.hash('secret')
+        return await service.verify('secret', hashed), await service.verify(
+            'wrong', hashed
+        )
+
+    assert asyncio.run(run()) == (True, False)
+
+    stats = service.stats()
+    service.shutdown()
+
+    assert stats['completed'] == 3  # noqa: PLR2004
+    assert stats['in_flight'] == 0
+    assert stats['hash_seconds_total'] > 0
+
+
+def test_hash_rejects_when_queue_is_full():
+    service = HashingService(executor='thread', workers=1, max_queue=1)
+
+    async def run():
+        return await asyncio.gather(
+            *(service.hash('secret') for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    service.shutdown()
+
+    rejected = [result for result in results if isinstance(result, HTTPException)]
+    assert len(rejected) == 1
+    assert rejected[0].status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert rejected[0].headers == {'Retry-After': '1'}
+    assert service.stats()['rejected'] == 1
+
+
+@pytest.mark.usefixtures('user')
+def test_get_token_overloaded(client, monkeypatch):
+    monkeypatch.setattr(hashing_service, 'capacity', 0)
+
+    response = client.post(
+        '/auth/token',
+        data={'username': 'test@test.com', 'password': 'testtest'},
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_app_shutdown_stops_the_hashing_pool():
+    with TestClient(app):
+        hashing_service._get_executor()
+    assert hashing_service._executor is None
@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from todo_teste import instrumentation
+from todo_teste.database import ThreadPoolSession, get_session
+from todo_teste.models import User
+
+
+def _app(session, budget):
+    app = FastAPI()
+
+    @app.get('/users')
+    @instrumentation.query_budget(budget)
+    async def list_users(db=Depends(get_session)):
+        # One query for the ids, then one per user: a textbook N+1.
+        ids = (await db.scalars(select(User.id))).all()
+        return [(await db.get(User, id, populate_existing=True)).id for id in ids]
+
+    app.dependency_overrides[get_session] = lambda: ThreadPoolSession(session)
+    return app
+
+
+def test_query_budget_raises_when_exceeded(session, user):
+    app = instrumentation.QueryBudgetMiddleware(_app(session, 1), mode='raise')
+
+    with (
+        TestClient(app) as client,
+        pytest.raises(instrumentation.QueryBudgetExceeded, match='ran 2 SQL'),
+    ):
+        client.get('/users')
+
+
+def test_query_budget_warns_when_exceeded(session, user, caplog):
+    app = instrumentation.QueryBudgetMiddleware(_app(session, 1))
+
+    with TestClient(app) as client:
+        response = client.get('/users')
+
+    assert response.json() == [user.id]
+    assert 'GET /users ran 2 SQL statements, over its budget of 1' in caplog.text
+
+
+def test_query_budget_is_quiet_within_budget(session, user, caplog):
+    app = instrumentation.QueryBudgetMiddleware(_app(session, 2), mode='raise')
+
+    with TestClient(app) as client:
+        client.get('/users')
+
+    assert 'budget' not in caplog.text
+
+
+def test_slow_queries_are_logged_with_their_plan(session, user, caplog, monkeypatch):
+    monkeypatch.setattr(instrumentation, '_slow_query_seconds', 0)
+
+    with caplog.at_level(logging.WARNING, logger='todo_teste.instrumentation'):
+        session.scalar(select(User).where(User.email == user.email))
+
+    assert 'Slow query' in caplog.text
+    assert 'SCAN users' in caplog.text or 'SEARCH users' in caplog.text
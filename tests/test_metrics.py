@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+
+from todo_teste import metrics
+from todo_teste.app import create_app
+from todo_teste.database import ThreadPoolSession, get_session
+from todo_teste.response_cache import response_cache
+from todo_teste.settings import Settings
+
+
+@pytest.fixture
+def metrics_client(session):
+    app = create_app(
+        Settings(
+            METRICS_ENABLED=True,
+            RATE_LIMIT_ENABLED=False,
+            PASSWORD_HASH_EXECUTOR='thread',
+        )
+    )
+    app.dependency_overrides[get_session] = lambda: ThreadPoolSession(session)
+
+    for metric in metrics.METRICS:
+        metric.clear()
+    with TestClient(app) as client:
+        yield client
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram('latency', 'Latency.', ('route',), buckets=(1, 5))
+    histogram.observe(0.5, '/a')
+    histogram.observe(3, '/a')
+    histogram.observe(7, '/a')
+
+    assert histogram.render() == [
+        '# HELP latency Latency.',
+        '# TYPE latency histogram',
+        'latency_bucket{route="/a",le="1"} 1',
+        'latency_bucket{route="/a",le="5"} 2',
+        'latency_bucket{route="/a",le="+Inf"} 3',
+        'latency_sum{route="/a"} 10.5',
+        'latency_count{route="/a"} 3',
+    ]
+
+
+def test_metrics_record_routes_queries_and_hashing(metrics_client, user):
+    token = metrics_client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    ).json()['access_token']
+    metrics_client.get('/todo/1', headers={'Authorization': f'Bearer {token}'})
+    metrics_client.get('/nowhere')
+
+    response = metrics_client.get('/metrics')
+    body = response.text
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    assert (
+        'http_requests_total{method="GET",route="/todo/{todo_id}",status="404"} 1'
+        in body
+    )
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in body
+    assert 'db_queries_per_request_count{method="POST",route="/auth/token"} 1' in body
+    assert 'db_queries_per_request_sum{method="GET",route="unmatched"} 0' in body
+    assert 'password_hash_duration_seconds_count{operation="verify"} 1' in body
+    assert 'http_requests_in_flight{method="GET"} 1' in body
+
+
+def test_metrics_include_response_cache_counters(metrics_client, user):
+    token = metrics_client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    ).json()['access_token']
+    before = response_cache.stats()
+    for _ in range(2):
+        metrics_client.get('/todo/', headers={'Authorization': f'Bearer {token}'})
+
+    body = metrics_client.get('/metrics').text
+
+    assert f'todo_list_cache_hits_total {before["hits"] + 1}' in body.splitlines()
+    assert f'todo_list_cache_misses_total {before["misses"] + 1}' in body.splitlines()
+    assert 'todo_list_cache_size 1' in body.splitlines()
@@ -0,0 +1,114 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+
+from todo_teste.app import app
+from todo_teste.ratelimit import Limit, MemoryRateLimitStore, parse_limit
+
+rate_limiter = app.state.rate_limiter
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_limit():
+    assert parse_limit('30/minute') == Limit(rate=0.5, burst=30)
+    with pytest.raises(ValueError, match='Invalid rate limit'):
+        parse_limit('30 per minute')
+
+
+def test_bucket_refills_over_time():
+    timer = FakeTimer()
+    store = MemoryRateLimitStore(maxsize=10, timer=timer)
+    limit = parse_limit('2/second')
+    half_a_second = 0.5
+
+    async def take():
+        return await store.take('key', limit)
+
+    assert [asyncio.run(take()) for _ in range(3)] == [0, 0, half_a_second]
+    timer.now = half_a_second
+    assert asyncio.run(take()) == 0
+    assert asyncio.run(take()) == half_a_second
+
+
+def test_store_drops_least_recently_used_bucket():
+    store = MemoryRateLimitStore(maxsize=2, timer=FakeTimer())
+    limit = parse_limit('1/hour')
+
+    async def scenario():
+        await store.take('a', limit)
+        await store.take('b', limit)
+        await store.take('a', limit)
+        await store.take('c', limit)
+        # 'b' was evicted, so it starts over with a full bucket.
+        return await store.take('c', limit), await store.take('b', limit)
+
+    assert asyncio.run(scenario()) == (3600, 0)
+    assert len(store) == len(['a', 'b'])
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    # Slow requests (argon2) would otherwise refill the buckets mid-test.
+    monkeypatch.setattr(rate_limiter.store, 'timer', FakeTimer())
+
+
+def test_login_is_rate_limited_before_hashing(frozen_time, client, user, monkeypatch):
+    for _ in range(10):
+        client.post('/auth/token', data={'username': user.email, 'password': 'wrong'})
+
+    async def verify(*args):
+        raise AssertionError('password hashed after the limit')
+
+    monkeypatch.setattr(app.state.hashing_service, 'verify', verify)
+    response = client.post(
+        '/auth/token', data={'username': user.email, 'password': 'wrong'}
+    )
+
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response.json() == {'detail': 'Too many requests'}
+    assert response.headers['Retry-After'] == '6'
+
+
+def test_route_limit_is_per_user(frozen_time, client, user, token, monkeypatch):
+    monkeypatch.setitem(rate_limiter.per_route, 'update_user', parse_limit('2/hour'))
+    headers = {'Authorization': f'Bearer {token}'}
+    for _ in range(2):
+        client.put(
+            f'/users/{user.id}',
+            headers=headers,
+            json={'username': 'x', 'email': user.email, 'password': 'y'},
+        )
+
+    throttled = client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={'username': 'x', 'email': user.email, 'password': 'y'},
+    )
+    anonymous = client.put(
+        f'/users/{user.id}',
+        json={'username': 'x', 'email': user.email, 'password': 'y'},
+    )
+
+    assert throttled.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert anonymous.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_per_ip_limit_is_opt_in(frozen_time, client, monkeypatch):
+    assert rate_limiter.per_ip is None
+
+    monkeypatch.setattr(rate_limiter, 'per_ip', parse_limit('2/hour'))
+    responses = [client.get('/users/') for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [
+        HTTPStatus.OK,
+        HTTPStatus.OK,
+        HTTPStatus.TOO_MANY_REQUESTS,
+    ]
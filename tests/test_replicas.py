@@ -0,0 +1,104 @@
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import insert
+
+from todo_teste import replicas
+from todo_teste.database import create_database_engine
+from todo_teste.models import User, table_registry
+from todo_teste.replicas import ReplicaPool
+from todo_teste.settings import Settings
+
+
+def _replica(path, username):
+    engine = create_database_engine(
+        Settings(DATABASE_URL=f'sqlite:///{path}', DATABASE_MODE='sync')
+    )
+    table_registry.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(User),
+            {'username': username, 'email': f'{username}@test.com', 'password': 'x'},
+        )
+    return engine
+
+
+@pytest.fixture
+def replica_pool(tmp_path, monkeypatch):
+    pool = ReplicaPool(
+        [
+            _replica(tmp_path / 'replica1.db', 'replica1'),
+            _replica(tmp_path / 'replica2.db', 'replica2'),
+        ],
+        retry_after=30,
+    )
+    monkeypatch.setattr(replicas, 'get_replica_pool', lambda app: pool)
+    yield pool
+    for engine in pool.engines:
+        engine.dispose()
+
+
+def _usernames(client):
+    return [user['username'] for user in client.get('/users/').json()['users']]
+
+
+def test_replica_pool_takes_turns_and_skips_replicas_marked_down():
+    now = 0
+    pool = ReplicaPool(['a', 'b', 'c'], retry_after=30, timer=lambda: now)
+
+    assert [pool.candidates()[0] for _ in range(4)] == ['a', 'b', 'c', 'a']
+
+    pool._down_until['b'] = 30
+    assert pool.healthy() == ['a', 'c']
+
+    now = 30
+    assert pool.healthy() == ['a', 'b', 'c']
+
+
+def test_reads_go_to_replicas_in_turn(client, replica_pool):
+    assert _usernames(client) == ['replica1']
+    assert _usernames(client) == ['replica2']
+    assert _usernames(client) == ['replica1']
+
+
+def test_replica_that_cannot_connect_is_marked_down(
+    client, user, replica_pool, tmp_path
+):
+    broken = create_database_engine(
+        Settings(
+            DATABASE_URL=f'sqlite:///{tmp_path / "missing" / "replica.db"}',
+            DATABASE_MODE='sync',
+        )
+    )
+    replica_pool.engines = [broken]
+
+    assert _usernames(client) == [user.username]
+    assert replica_pool.healthy() == []
+
+
+def test_reads_after_a_write_go_to_the_primary(client, user, token, replica_pool):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    assert client.get('/todo/', headers=headers).json()['todos'] == []
+
+    response = client.post(
+        '/todo/',
+        headers=headers,
+        json={'title': 'title', 'description': 'description', 'status': 'pending'},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    todos = client.get('/todo/', headers=headers).json()['todos']
+    assert [todo['title'] for todo in todos] == ['title']
+    # Reads by other callers still go to the replicas.
+    assert _usernames(client) in (['replica1'], ['replica2'])
+
+
+def test_new_user_reads_from_the_primary(client, replica_pool):
+    response = client.post(
+        '/users/',
+        json={'username': 'new', 'email': 'new@test.com', 'password': 'secret'},
+    )
+    assert response.status_code == HTTPStatus.CREATED
+
+    assert replicas.recent_writes.get('new@test.com')
@@ -2,12 +2,14 @@ from http import HTTPStatus
 
 from jwt import decode
 
-from todo_teste.security import create_access_token, settings
+from todo_teste.app import app
+from todo_teste.security import create_access_token, user_cache
 
 
 def test_jwt(token):
     data = {'sub': 'test@test.com'}
     token = create_access_token(data)
+    settings = app.state.settings
 
     result = decode(
         token,
@@ -26,3 +28,45 @@ def test_jwt_invalid_token(client):
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_current_user_is_served_from_cache(session, client, user, token):
+    session.delete(user)
+    session.commit()
+
+    response = client.get('/todo', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_current_user_cache_miss_hits_database(session, client, user, token):
+    user_cache.clear()
+    session.delete(user)
+    session.commit()
+
+    response = client.get('/todo', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_update_user_invalidates_cache(client, user, token):
+    assert user_cache.get(user.email) is not None
+
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'other', 'email': 'other@test.com', 'password': '123'},
+    )
+
+    assert user_cache.get(user.email) is None
+
+
+def test_trusted_claims_skip_user_lookup(session, client, user, token, monkeypatch):
+    monkeypatch.setattr(app.state.settings, 'AUTH_TRUST_TOKEN_CLAIMS', True)
+    user_cache.clear()
+    session.delete(user)
+    session.commit()
+
+    response = client.get('/todo', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == HTTPStatus.OK
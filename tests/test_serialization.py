@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from todo_teste.models import TodoStatus
+from todo_teste.schemas import TodoChanges, TodoList, UserList
+from todo_teste.serialization import (
+    TODO_FIELDS,
+    USER_FIELDS,
+    todo_changes_json,
+    todo_list_json,
+    user_list_json,
+)
+
+
+def test_todo_list_json_matches_pydantic_output():
+    rows = [
+        (
+            'título "quoted" \\ \n\t\x01 😀',
+            'description',
+            TodoStatus.done,
+            1,
+            datetime(2024, 1, 1, 12, 30),
+            datetime(2024, 1, 2, 8, 0, 0, 123456),
+            datetime(2024, 1, 3),
+        ),
+        (
+            'title',
+            '',
+            TodoStatus.pending,
+            2,
+            datetime(2024, 1, 1),
+            datetime(2024, 1, 1),
+            None,
+        ),
+    ]
+
+    expected = TodoList.model_validate({
+        'todos': [dict(zip(TODO_FIELDS, row)) for row in rows],
+        'next_cursor': 'abc',
+    }).model_dump_json()
+
+    assert todo_list_json(rows, 'abc') == expected.encode()
+    assert todo_list_json([], None) == b'{"todos":[],"next_cursor":null}'
+
+
+def test_user_list_json_matches_pydantic_output():
+    rows = [(1, 'Teste', 'test@test.com'), (2, 'Ünïcode', 'other@test.com')]
+
+    expected = UserList.model_validate({
+        'users': [dict(zip(USER_FIELDS, row)) for row in rows]
+    }).model_dump_json()
+
+    assert user_list_json(rows) == expected.encode()
+
+
+def test_todo_changes_json_matches_pydantic_output():
+    rows = [
+        (
+            'title',
+            'description',
+            TodoStatus.running,
+            3,
+            datetime(2024, 1, 1),
+            datetime(2024, 1, 2),
+            None,
+        )
+    ]
+
+    expected = TodoChanges.model_validate({
+        'todos': [dict(zip(TODO_FIELDS, row)) for row in rows],
+        'deleted': [1, 2],
+        'watermark': 'abc',
+    }).model_dump_json()
+
+    assert todo_changes_json(rows, [1, 2], 'abc') == expected.encode()
@@ -0,0 +1,109 @@
+import subprocess
+import sys
+from http import HTTPStatus
+
+from anyio import to_thread
+from fastapi.testclient import TestClient
+from jwt import decode
+from sqlalchemy import create_engine
+
+from todo_teste import server
+from todo_teste.app import create_app
+from todo_teste.models import table_registry
+from todo_teste.settings import Settings
+
+
+def test_uvicorn_options_come_from_settings():
+    options = server.uvicorn_options(
+        Settings(
+            SERVER_WORKERS=3,
+            SERVER_LOOP='uvloop',
+            SERVER_HTTP='httptools',
+            SERVER_BACKLOG=4096,
+            SERVER_KEEPALIVE_TIMEOUT=75,
+            SERVER_GRACEFUL_TIMEOUT=10,
+        )
+    )
+
+    assert (
+        options
+        | {
+            'workers': 3,
+            'loop': 'uvloop',
+            'http': 'httptools',
+            'backlog': 4096,
+            'timeout_keep_alive': 75,
+            'timeout_graceful_shutdown': 10,
+        }
+        == options
+    )
+
+
+def test_one_worker_per_cpu_by_default(monkeypatch):
+    cpus = 8
+    monkeypatch.setattr(server.os, 'cpu_count', lambda: cpus)
+
+    assert server.worker_count(Settings(SERVER_WORKERS=None)) == cpus
+
+
+def test_hashing_pools_share_the_cpus(monkeypatch):
+    monkeypatch.setattr(server.os, 'cpu_count', lambda: 8)
+
+    assert server.hashing_workers_env(Settings(SERVER_WORKERS=4)) == {
+        'PASSWORD_HASH_WORKERS': '2'
+    }
+    assert (
+        server.hashing_workers_env(Settings(SERVER_WORKERS=4, PASSWORD_HASH_WORKERS=1))
+        == {}
+    )
+
+
+def test_lifespan_sizes_the_threadpool():
+    threadpool_size = 7
+    with TestClient(create_app(Settings(THREADPOOL_SIZE=threadpool_size))) as client:
+        total_tokens = client.portal.call(
+            lambda: to_thread.current_default_thread_limiter().total_tokens
+        )
+
+    assert total_tokens == threadpool_size
+
+
+def test_app_is_built_from_its_settings(tmp_path):
+    database_url = f'sqlite:///{tmp_path / "app.db"}'
+    engine = create_engine(database_url)
+    table_registry.metadata.create_all(engine)
+    engine.dispose()
+    settings = Settings(
+        DATABASE_URL=database_url,
+        SECRET_KEY='app secret',
+        PASSWORD_HASH_EXECUTOR='thread',
+        RATE_LIMITS={'create_user': '1/hour'},
+    )
+    user = {'username': 'app', 'email': 'app@test.com', 'password': 'secret'}
+
+    with TestClient(create_app(settings)) as client:
+        created = client.post('/users/', json=user)
+        throttled = client.post('/users/', json=user)
+        token = client.post(
+            '/auth/token', data={'username': user['email'], 'password': 'secret'}
+        ).json()['access_token']
+
+    assert created.status_code == HTTPStatus.CREATED
+    assert throttled.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert decode(token, 'app secret', algorithms=['HS256'])['sub'] == user['email']
+
+
+def test_importing_the_app_module_builds_nothing():
+    code = (
+        'import sys, todo_teste.app; '
+        'print(*sorted(m for m in sys.modules if m.startswith("todo_teste")))'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.split() == [
+        'todo_teste',
+        'todo_teste.app',
+        'todo_teste.settings',
+    ]
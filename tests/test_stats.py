@@ -0,0 +1,94 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from todo_teste.database import ThreadPoolSession
+from todo_teste.models import Todo, TodoStatus
+from todo_teste.stats import rebuild_todo_stats
+
+
+def _stats(client, token):
+    return client.get(
+        '/todo/stats', headers={'Authorization': f'Bearer {token}'}
+    ).json()
+
+
+def test_stats_without_todos(client, token):
+    assert _stats(client, token) == {
+        'total': 0,
+        'by_status': {'pending': 0, 'running': 0, 'done': 0},
+        'completed_per_day': [],
+        'average_seconds_to_done': None,
+    }
+
+
+def test_stats_follow_every_write(session, client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    todo = {'title': 't', 'description': 'd', 'status': 'pending'}
+
+    first = client.post('/todo/', headers=headers, json=todo).json()['id']
+    second = client.post('/todo/', headers=headers, json=todo).json()['id']
+    bulk = client.post(
+        '/todo/bulk',
+        headers=headers,
+        json={'todos': [{**todo, 'status': 'running'}, {**todo, 'status': 'running'}]},
+    ).json()['todos']
+    client.post('/todo/import', headers=headers, content=json.dumps(todo))
+    client.put(f'/todo/{first}', headers=headers, json={**todo, 'status': 'done'})
+    client.put(f'/todo/{second}', headers=headers, json={**todo, 'title': 'x'})
+    client.patch(
+        '/todo/bulk',
+        headers=headers,
+        json={'todos': [{**todo, 'id': bulk[0]['id'], 'status': 'done'}]},
+    )
+    client.delete(f'/todo/{second}', headers=headers)
+    client.request(
+        'DELETE', '/todo/bulk', headers=headers, json={'ids': [bulk[1]['id']]}
+    )
+
+    stats = _stats(client, token)
+    today = datetime.utcnow().date().isoformat()
+    assert stats['by_status'] == {'pending': 1, 'running': 0, 'done': 2}
+    assert stats['total'] == sum(stats['by_status'].values())
+    assert stats['completed_per_day'] == [{'day': today, 'count': 2}]
+    assert stats['average_seconds_to_done'] >= 0
+
+    client.put(f'/todo/{first}', headers=headers, json=todo)
+    assert _stats(client, token)['completed_per_day'] == [{'day': today, 'count': 1}]
+
+    asyncio.run(rebuild_todo_stats(ThreadPoolSession(session)))
+    session.commit()
+    rebuilt = _stats(client, token)
+    assert rebuilt['by_status'] == {'pending': 2, 'running': 0, 'done': 1}
+    assert rebuilt['completed_per_day'] == [{'day': today, 'count': 1}]
+
+
+def test_rebuild_backfills_existing_todos(session, client, user, token):
+    now = datetime.utcnow().replace(microsecond=0)
+    todos = [
+        Todo(title='a', description='d', status=TodoStatus.done, user_id=user.id),
+        Todo(title='b', description='d', status=TodoStatus.done, user_id=user.id),
+        Todo(title='c', description='d', status=TodoStatus.running, user_id=user.id),
+    ]
+    session.add_all(todos)
+    session.flush()
+    for todo, days_ago in zip(todos[:2], (3, 1)):
+        todo.created_at = now - timedelta(days=days_ago, hours=2)
+        todo.done_at = now - timedelta(days=days_ago)
+    session.commit()
+
+    asyncio.run(rebuild_todo_stats(ThreadPoolSession(session), user.id))
+    session.commit()
+    stats = client.get(
+        '/todo/stats', headers={'Authorization': f'Bearer {token}'}, params={'days': 2}
+    ).json()
+
+    assert stats['by_status'] == {'pending': 0, 'running': 1, 'done': 2}
+    assert stats['completed_per_day'] == [
+        {'day': (now - timedelta(days=1)).date().isoformat(), 'count': 1}
+    ]
+    assert stats['average_seconds_to_done'] == pytest.approx(
+        timedelta(hours=2).total_seconds()
+    )
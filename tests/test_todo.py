@@ -1,6 +1,19 @@
+import csv
+import json
+import re
+from datetime import datetime, timedelta
 from http import HTTPStatus
 
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
+
+from todo_teste import search
+from todo_teste.app import app
 from todo_teste.models import Todo, TodoStatus
+from todo_teste.response_cache import response_cache
+from todo_teste.schemas import TodoFilters
+from todo_teste.security import user_cache
 
 
 def test_create_todo(client, token):
@@ -340,4 +353,626 @@ def test_delete_todo_error(client, token):
     )
 
     assert response.status_code == HTTPStatus.NOT_FOUND
-    assert response.json() == {'detail': 'Not Found'}
\ No newline at end of file
+    assert response.json() == {'detail': 'Not Found'}
+
+
+def test_list_todos_keyset_pagination(session, client, user, token):
+    total_todos = 5
+
+    session.add_all([
+        Todo(
+            title=f'Task {i}',
+            description='description',
+            status=TodoStatus.pending,
+            user_id=user.id,
+        )
+        for i in range(total_todos)
+    ])
+    session.commit()
+
+    titles = []
+    cursor = None
+    while True:
+        params = {'limit': 2} if cursor is None else {'limit': 2, 'cursor': cursor}
+        response = client.get(
+            '/todo/', params=params, headers={'Authorization': f'Bearer {token}'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        titles += [todo['title'] for todo in response.json()['todos']]
+        cursor = response.json()['next_cursor']
+        if cursor is None:
+            break
+
+    assert titles == [f'Task {i}' for i in range(total_todos)]
+
+
+def test_list_todos_invalid_cursor(client, token):
+    response = client.get(
+        '/todo/?cursor=not-a-cursor',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+@pytest.fixture
+def sorted_todos(session, user):
+    # Titles and done_at run in opposite orders; 'c' and 'e' are not done.
+    now = datetime(2026, 1, 10, 12, 0)
+    todos = []
+    for title, days_ago in [('e', None), ('d', 1), ('c', None), ('b', 2), ('a', 3)]:
+        todo = Todo(
+            title=title,
+            description='d',
+            status=TodoStatus.pending if days_ago is None else TodoStatus.done,
+            user_id=user.id,
+        )
+        session.add(todo)
+        session.flush()
+        if days_ago is not None:
+            todo.done_at = now - timedelta(days=days_ago)
+        todos.append(todo)
+    session.commit()
+
+
+def _list_titles(client, token, params, page_size=2):
+    titles, cursor = [], None
+    while True:
+        page_params = {**params, 'limit': page_size}
+        if cursor:
+            page_params['cursor'] = cursor
+        response = client.get(
+            '/todo/', params=page_params, headers={'Authorization': f'Bearer {token}'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        titles += [todo['title'] for todo in response.json()['todos']]
+        cursor = response.json()['next_cursor']
+        if cursor is None or len(titles) > len('abcde'):
+            return titles
+
+
+@pytest.mark.parametrize(
+    ('params', 'expected'),
+    [
+        ({'order_by': 'title'}, 'abcde'),
+        ({'order_by': 'title', 'direction': 'desc'}, 'edcba'),
+        ({'order_by': 'status'}, 'dbaec'),
+        ({'order_by': 'done_at'}, 'abdec'),
+        ({'order_by': 'done_at', 'direction': 'desc'}, 'dbace'),
+        ({'order_by': 'created_at', 'direction': 'desc'}, 'abcde'),
+        ({'direction': 'desc'}, 'abcde'),
+    ],
+)
+@pytest.mark.usefixtures('sorted_todos')
+def test_list_todos_sorted(client, token, params, expected):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    # Keyset pages (a cursor) and offset pages agree.
+    by_offset = [
+        todo['title']
+        for offset in range(0, len(expected), 2)
+        for todo in client.get(
+            '/todo/', headers=headers, params={**params, 'offset': offset, 'limit': 2}
+        ).json()['todos']
+    ]
+
+    assert ''.join(_list_titles(client, token, params)) == expected
+    assert ''.join(by_offset) == expected
+
+
+@pytest.mark.usefixtures('sorted_todos')
+def test_list_todos_cursor_is_bound_to_its_order(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    cursor = client.get(
+        '/todo/', headers=headers, params={'order_by': 'title', 'limit': 2}
+    ).json()['next_cursor']
+
+    response = client.get(
+        '/todo/', headers=headers, params={'order_by': 'done_at', 'cursor': cursor}
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_list_todo_search_is_ranked(session, client, user, token):
+    session.add_all([
+        Todo(
+            title='report about the long quarterly budget planning meeting',
+            description='description',
+            status=TodoStatus.pending,
+            user_id=user.id,
+        ),
+        Todo(
+            title='unrelated',
+            description='description',
+            status=TodoStatus.pending,
+            user_id=user.id,
+        ),
+        Todo(
+            title='report',
+            description='description',
+            status=TodoStatus.pending,
+            user_id=user.id,
+        ),
+    ])
+    session.commit()
+
+    response = client.get(
+        '/todo/?title=repo',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [todo['title'] for todo in response.json()['todos']] == [
+        'report',
+        'report about the long quarterly budget planning meeting',
+    ]
+
+
+def test_list_todo_search_follows_updates(session, client, user, token):
+    todo = Todo(
+        title='old title',
+        description='description',
+        status=TodoStatus.pending,
+        user_id=user.id,
+    )
+    session.add(todo)
+    session.commit()
+
+    client.put(
+        f'/todo/{todo.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'title': 'new title', 'description': 'd', 'status': 'pending'},
+    )
+
+    old = client.get('/todo/?title=old', headers={'Authorization': f'Bearer {token}'})
+    new = client.get('/todo/?title=new', headers={'Authorization': f'Bearer {token}'})
+
+    assert old.json()['todos'] == []
+    assert [todo['title'] for todo in new.json()['todos']] == ['new title']
+
+
+def test_list_todo_like_search_mode(session, client, user, token, monkeypatch):
+    monkeypatch.setattr(app.state.settings, 'TODO_SEARCH_MODE', 'like')
+    session.add(
+        Todo(
+            title='report',
+            description='description',
+            status=TodoStatus.pending,
+            user_id=user.id,
+        )
+    )
+    session.commit()
+
+    response = client.get(
+        '/todo/?title=epor',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert [todo['title'] for todo in response.json()['todos']] == ['report']
+
+
+def test_create_todos_bulk(client, token):
+    response = client.post(
+        '/todo/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'todos': [
+                {'title': 'first', 'description': 'd', 'status': 'pending'},
+                {'title': 'broken', 'status': 'unknown'},
+                {'title': 'second', 'description': 'd', 'status': 'done'},
+            ]
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [todo['title'] for todo in response.json()['todos']] == [
+        'first',
+        'second',
+    ]
+    assert all(todo['id'] for todo in response.json()['todos'])
+    assert [error['index'] for error in response.json()['errors']] == [1]
+
+
+def test_create_todos_bulk_too_many_items(client, token, monkeypatch):
+    monkeypatch.setattr(app.state.settings, 'TODO_BULK_MAX_ITEMS', 1)
+
+    response = client.post(
+        '/todo/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'todos': [{}, {}]},
+    )
+
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+def test_update_todos_bulk(session, client, user, token):
+    running = Todo(
+        title='running',
+        description='d',
+        status=TodoStatus.running,
+        user_id=user.id,
+    )
+    done = Todo(
+        title='done', description='d', status=TodoStatus.running, user_id=user.id
+    )
+    session.add_all([running, done])
+    session.commit()
+
+    response = client.patch(
+        '/todo/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'todos': [
+                {
+                    'id': running.id,
+                    'title': 'still running',
+                    'description': 'd',
+                    'status': 'running',
+                },
+                {'id': done.id, 'title': 'done', 'description': 'd', 'status': 'done'},
+                {'id': 999, 'title': 'x', 'description': 'd', 'status': 'done'},
+            ]
+        },
+    )
+
+    todos = response.json()['todos']
+    assert response.status_code == HTTPStatus.OK
+    assert [todo['title'] for todo in todos] == ['still running', 'done']
+    assert todos[0]['done_at'] is None
+    assert todos[1]['done_at'] is not None
+    assert response.json()['errors'] == [{'index': 2, 'detail': 'Not Found'}]
+
+
+def test_delete_todos_bulk(session, client, user, token):
+    todo = Todo(title='t', description='d', status=TodoStatus.done, user_id=user.id)
+    session.add(todo)
+    session.commit()
+
+    response = client.request(
+        'DELETE',
+        '/todo/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'ids': [todo.id, 999]},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'deleted': [todo.id],
+        'errors': [{'index': 1, 'detail': 'Not Found'}],
+    }
+
+
+def test_export_todos_ndjson(session, client, user, token):
+    session.add_all([
+        Todo(
+            title=f'Task {i}',
+            description='description',
+            status=TodoStatus.pending if i % 2 else TodoStatus.done,
+            user_id=user.id,
+        )
+        for i in range(4)
+    ])
+    session.commit()
+
+    response = client.get(
+        '/todo/export?status=done',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert [line['title'] for line in lines] == ['Task 0', 'Task 2']
+    assert list(lines[0]) == [
+        'title',
+        'description',
+        'status',
+        'id',
+        'created_at',
+        'updated_at',
+        'done_at',
+    ]
+
+
+def test_export_todos_csv(session, client, user, token):
+    session.add(
+        Todo(
+            title='with, comma',
+            description='description',
+            status=TodoStatus.running,
+            user_id=user.id,
+        )
+    )
+    session.commit()
+
+    response = client.get(
+        '/todo/export?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    rows = list(csv.reader(response.text.splitlines()))
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/csv')
+    assert rows[0][:3] == ['title', 'description', 'status']
+    assert rows[1][:4] == ['with, comma', 'description', 'running', '1']
+    assert not rows[1][-1]
+
+
+def test_import_todos_ndjson(session, client, token, monkeypatch):
+    monkeypatch.setattr(app.state.settings, 'TODO_IMPORT_BATCH_SIZE', 2)
+    body = '\n'.join(
+        [
+            json.dumps({'title': f'Task {i}', 'description': 'd', 'status': 'pending'})
+            for i in range(3)
+        ]
+        + ['', '{"title": "missing fields"}', 'not json']
+    )
+
+    response = client.post(
+        '/todo/import',
+        content=body,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['imported'] == 3  # noqa: PLR2004
+    assert response.json()['failed'] == 2  # noqa: PLR2004
+    assert [error['line'] for error in response.json()['errors']] == [5, 6]
+    assert session.scalars(select(Todo.title)).all() == [
+        'Task 0',
+        'Task 1',
+        'Task 2',
+    ]
+
+
+def test_import_todos_csv(session, client, token):
+    body = (
+        'title,description,status\r\n'
+        '"with, comma","spans\r\ntwo lines",running\r\n'
+        'bad status,d,unknown\r\n'
+        'too,few\r\n'
+    )
+
+    response = client.post(
+        '/todo/import?format=csv',
+        content=body.encode(),
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['imported'] == 1
+    assert [error['line'] for error in response.json()['errors']] == [4, 5]
+    todo = session.scalar(select(Todo))
+    assert todo.title == 'with, comma'
+    assert todo.description == 'spans\ntwo lines'
+
+
+def test_list_todo_etag_not_modified_skips_list_query(session, client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    first = client.get('/todo/?limit=5&offset=0', headers=headers)
+    etag = first.headers['etag']
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(session.bind, 'before_cursor_execute', record)
+    # Same filters in a different order hit the same ETag.
+    response = client.get(
+        '/todo/?offset=0&limit=5', headers={**headers, 'If-None-Match': etag}
+    )
+    event.remove(session.bind, 'before_cursor_execute', record)
+
+    assert etag.startswith('W/"')
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['etag'] == etag
+    assert not response.content
+    assert not [
+        statement
+        for statement in statements
+        if re.search(r'\bFROM todo\b(?!_)', statement)
+    ]
+
+
+def test_list_todo_etag_changes_after_write(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/todo/', headers=headers).headers['etag']
+
+    client.post(
+        '/todo/',
+        headers=headers,
+        json={'title': 'new', 'description': 'd', 'status': 'pending'},
+    )
+    response = client.get('/todo/', headers={**headers, 'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['etag'] != etag
+    assert response.json()['todos'][0]['title'] == 'new'
+
+
+def test_read_todo_if_modified_since(session, client, user, token, mock_db_time):
+    with mock_db_time(model=Todo, time=datetime(2024, 1, 1, 12)):
+        todo = Todo(
+            title='title',
+            description='description',
+            status=TodoStatus.pending,
+            user_id=user.id,
+        )
+        session.add(todo)
+        session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.get(f'/todo/{todo.id}', headers=headers)
+    not_modified = client.get(
+        f'/todo/{todo.id}',
+        headers={**headers, 'If-Modified-Since': 'Mon, 01 Jan 2024 12:00:00 GMT'},
+    )
+    modified = client.get(
+        f'/todo/{todo.id}',
+        headers={**headers, 'If-Modified-Since': 'Mon, 01 Jan 2024 11:59:59 GMT'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['title'] == 'title'
+    assert response.headers['last-modified'] == 'Mon, 01 Jan 2024 12:00:00 GMT'
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert modified.status_code == HTTPStatus.OK
+
+
+def test_read_todo_not_found(client, token):
+    response = client.get('/todo/1', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Not Found'}
+
+
+def test_user_cache_miss_lookup_is_left_out_of_the_budget(session, client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    statements = []
+
+    @event.listens_for(session.bind, 'after_cursor_execute')
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    client.get('/todo/stats', headers=headers)
+    warm, statements[:] = list(statements), []
+    user_cache.clear()
+    # The client raises if the lookup counted against the route's budget.
+    response = client.get('/todo/stats', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(warm) == 2  # noqa: PLR2004
+    assert len(statements) == len(warm) + 1
+    assert 'FROM users' in statements[0]
+
+
+def test_list_todo_served_from_response_cache(session, client, user, token):
+    session.add(
+        Todo(
+            title='cached',
+            description='description',
+            status=TodoStatus.pending,
+            user_id=user.id,
+        )
+    )
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    first = client.get('/todo/?status=pending', headers=headers)
+    hits = response_cache.stats()['hits']
+    second = client.get('/todo/?limit=100&status=pending', headers=headers)
+
+    assert second.content == first.content
+    assert (
+        first.content
+        == json.dumps(first.json(), separators=(',', ':'), ensure_ascii=False).encode()
+    )
+    assert response_cache.stats()['hits'] == hits + 1
+    assert response_cache.stats()['size'] == 1
+
+
+def test_list_todo_cache_invalidated_by_update(session, client, user, token):
+    todo = Todo(
+        title='before',
+        description='description',
+        status=TodoStatus.pending,
+        user_id=user.id,
+    )
+    session.add(todo)
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/todo/', headers=headers)
+
+    client.put(
+        f'/todo/{todo.id}',
+        headers=headers,
+        json={'title': 'after', 'description': 'd', 'status': 'done'},
+    )
+    response = client.get('/todo/', headers=headers)
+
+    assert response.json()['todos'][0]['title'] == 'after'
+    assert response_cache.stats()['size'] == 1
+
+
+def _changes(client, headers, since=None):
+    params = {'since': since} if since else {}
+    response = client.get('/todo/changes', headers=headers, params=params)
+    assert response.status_code == HTTPStatus.OK
+    return response.json()
+
+
+def test_todo_changes_report_writes_and_deletions_since_watermark(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    ids = [
+        client.post(
+            '/todo/',
+            headers=headers,
+            json={'title': f'todo {i}', 'description': 'd', 'status': 'pending'},
+        ).json()['id']
+        for i in range(3)
+    ]
+
+    first = _changes(client, headers)
+    assert [todo['id'] for todo in first['todos']] == ids
+    assert first['deleted'] == []
+
+    client.put(
+        f'/todo/{ids[0]}',
+        headers=headers,
+        json={'title': 'changed', 'description': 'd', 'status': 'done'},
+    )
+    client.delete(f'/todo/{ids[1]}', headers=headers)
+    client.request('DELETE', '/todo/bulk', headers=headers, json={'ids': [ids[2]]})
+
+    second = _changes(client, headers, first['watermark'])
+    assert [todo['title'] for todo in second['todos']] == ['changed']
+    assert second['deleted'] == [ids[1], ids[2]]
+
+    third = _changes(client, headers, second['watermark'])
+    assert third == {'todos': [], 'deleted': [], 'watermark': second['watermark']}
+
+
+def test_todo_changes_include_bulk_and_imported_todos(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    watermark = _changes(client, headers)['watermark']
+
+    client.post(
+        '/todo/bulk',
+        headers=headers,
+        json={'todos': [{'title': 'bulk', 'description': 'd', 'status': 'pending'}]},
+    )
+    client.post(
+        '/todo/import',
+        headers=headers,
+        content=b'{"title": "imported", "description": "d", "status": "pending"}\n',
+    )
+
+    changes = _changes(client, headers, watermark)
+
+    assert [todo['title'] for todo in changes['todos']] == ['bulk', 'imported']
+
+
+def test_todo_changes_invalid_watermark(client, token):
+    response = client.get(
+        '/todo/changes',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'since': 'not-a-watermark'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_postgres_search_matches_the_gin_index_expression():
+    query, _ = search.apply_text_search(
+        select(Todo.id), TodoFilters(title='report'), 'postgresql', 'fulltext'
+    )
+
+    sql = str(query.compile(dialect=postgresql.asyncpg.dialect()))
+
+    assert "to_tsvector('simple', todo.title)" in sql
+    assert "to_tsquery('simple'," in sql
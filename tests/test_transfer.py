@@ -0,0 +1,109 @@
+import asyncio
+import csv
+
+from todo_teste.transfer import LINE_TOO_LONG, parse_todos
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def _parse(data: bytes, transfer_format: str, size: int = 3):
+    async def collect():
+        return [
+            item async for item in parse_todos(_chunks(data, size), transfer_format)
+        ]
+
+    return asyncio.run(collect())
+
+
+def test_parse_ndjson_across_chunk_boundaries():
+    data = (
+        '{"title": "café", "description": "d", "status": "pending"}\n'
+        '{"title": "second", "description": "d", "status": "done"}'
+    ).encode()
+
+    parsed = _parse(data, 'ndjson')
+
+    assert [(line, todo.title, error) for line, todo, error in parsed] == [
+        (1, 'café', None),
+        (2, 'second', None),
+    ]
+
+
+def test_parse_csv_quoted_newlines_and_escaped_quotes():
+    data = b'title,description,status\n"say ""hi""","a\nb",running\n'
+
+    [(line, todo, error)] = _parse(data, 'csv')
+
+    assert line == 2  # noqa: PLR2004
+    assert error is None
+    assert todo.title == 'say "hi"'
+    assert todo.description == 'a\nb'
+
+
+def test_parse_csv_skips_byte_order_mark():
+    data = '\ufefftitle,description,status\nfirst,d,pending\n'.encode()
+
+    [(line, todo, error)] = _parse(data, 'csv', size=1)
+
+    assert (line, todo.title, error) == (2, 'first', None)
+
+
+def test_parse_reports_lines_too_long_and_continues(monkeypatch):
+    monkeypatch.setattr('todo_teste.transfer.MAX_LINE_LENGTH', 40)
+    todo = b'{"title": "t", "description": "d", "status": "done"}'
+    ndjson = b'\n'.join([b'{"title": "ok", "description": "d"}', todo, b'x' * 100])
+    csv_data = b'\n'.join([
+        b'title,description,status',
+        b'"quoted,d,pending',
+        b'x' * 100,
+        b'next,d,pending',
+    ])
+
+    parsed = _parse(ndjson, 'ndjson', size=8) + _parse(csv_data, 'csv', size=8)
+
+    assert [(line, error == LINE_TOO_LONG) for line, _, error in parsed] == [
+        (1, False),
+        (2, True),
+        (3, True),
+        (2, False),
+        (3, True),
+        (4, False),
+    ]
+    assert parsed[3][2] == 'Unterminated quoted field'
+    assert parsed[5][1].title == 'next'
+
+
+def test_parse_csv_reports_malformed_records_and_continues(monkeypatch):
+    monkeypatch.setattr('todo_teste.transfer.CSV_MAX_RECORD_LINES', 2)
+    field_size_limit = csv.field_size_limit(50)
+    data = b'\n'.join([
+        b'title,description,status',
+        b'5" screen,d,pending',
+        b'"unterminated,d,pending',
+        b'next,d,pending',
+        b'x' * 60 + b',d,pending',
+        b'last,d,done',
+    ])
+
+    try:
+        parsed = _parse(data, 'csv')
+    finally:
+        csv.field_size_limit(field_size_limit)
+
+    assert [(line, todo and todo.title) for line, todo, _ in parsed] == [
+        (2, '5" screen'),
+        (3, None),
+        (4, 'next'),
+        (5, None),
+        (6, 'last'),
+    ]
+    assert parsed[1][2] == 'Unterminated quoted field'
+
+
+def test_parse_csv_unterminated_last_record():
+    [(line, todo, error)] = _parse(b'title,description,status\n"a,b\n', 'csv')
+
+    assert (line, todo, error) == (2, None, 'Unterminated quoted field')
@@ -1,5 +1,8 @@
 from http import HTTPStatus
 
+from sqlalchemy import event, select
+
+from todo_teste.routers.users import USER_TABLES
 from todo_teste.schemas import UserPublic
 
 
@@ -35,6 +38,20 @@ def test_read_user_with_user(client, user):
     assert response.json() == {'users': [user_schema]}
 
 
+def test_read_users_does_not_load_passwords(session, client, user):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(session.bind, 'before_cursor_execute', record)
+    client.get('/users/')
+    event.remove(session.bind, 'before_cursor_execute', record)
+
+    [statement] = statements
+    assert 'password' not in statement
+
+
 def test_update_user(client, user, token):
     response = client.put(
         f'/users/{user.id}',
@@ -81,6 +98,20 @@ def test_delete_user(client, user, token):
     assert response.json() == {'message': 'User deleted!'}
 
 
+def test_delete_user_deletes_its_todos_and_stats(session, client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    todo = {'title': 't', 'description': 'd', 'status': 'done'}
+    todo_id = client.post('/todo/', headers=headers, json=todo).json()['id']
+    client.post('/todo/', headers=headers, json=todo)
+    client.delete(f'/todo/{todo_id}', headers=headers)
+
+    response = client.delete(f'/users/{user.id}', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    for table in USER_TABLES:
+        assert session.scalars(select(table)).all() == []
+
+
 def test_delete_wrong_user(client, user, token):
     response = client.delete(
         f'/users/{user.id + 1}',
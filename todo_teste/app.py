@@ -1,9 +1,92 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
 
-from todo_teste.routers import auth, todo, users
+from fastapi import Depends, FastAPI
 
-app = FastAPI()
+from todo_teste.settings import Settings, get_settings
 
-app.include_router(users.router)
-app.include_router(auth.router)
-app.include_router(todo.router)
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """Build the application from `settings` (default `get_settings()`).
+
+    The app owns its engine, replica pool, rate limiter and password hasher,
+    kept on `app.state`. The user and response caches and the event broker
+    are shared by the process and sized here.
+    """
+    # Imported here so importing this module stays cheap; the routers pull
+    # in SQLAlchemy, pydantic schemas and JWT.
+    from anyio import to_thread  # noqa: PLC0415
+
+    from todo_teste import instrumentation, metrics  # noqa: PLC0415
+    from todo_teste.database import dispose_engine  # noqa: PLC0415
+    from todo_teste.events import (  # noqa: PLC0415
+        close_on_exit_signals,
+        todo_events,
+    )
+    from todo_teste.hashing import create_hashing_service  # noqa: PLC0415
+    from todo_teste.ratelimit import create_rate_limiter  # noqa: PLC0415
+    from todo_teste.replicas import recent_writes  # noqa: PLC0415
+    from todo_teste.response_cache import response_cache  # noqa: PLC0415
+    from todo_teste.routers import auth, todo, users  # noqa: PLC0415
+    from todo_teste.security import user_cache  # noqa: PLC0415
+
+    settings = settings or get_settings()
+
+    user_cache.maxsize = settings.USER_CACHE_SIZE
+    user_cache.ttl = settings.USER_CACHE_TTL
+    recent_writes.maxsize = settings.READ_YOUR_WRITES_SIZE
+    recent_writes.ttl = settings.READ_YOUR_WRITES_SECONDS
+    response_cache.backend.maxsize = settings.TODO_LIST_CACHE_SIZE
+    response_cache.backend.ttl = settings.TODO_LIST_CACHE_TTL
+    todo_events.queue_size = settings.TODO_STREAM_QUEUE_SIZE
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Sync dependencies, `ThreadPoolSession` and the sync engine all share
+        # this limiter; it is per event loop, so each worker sets its own.
+        to_thread.current_default_thread_limiter().total_tokens = (
+            settings.THREADPOOL_SIZE
+        )
+        await todo_events.start()
+        with close_on_exit_signals(todo_events):
+            yield
+            # For servers that stop without a signal, e.g. the test client.
+            todo_events.close_all()
+        await todo_events.stop()
+        app.state.hashing_service.shutdown()
+        engines = [app.state.engine] if app.state.engine else []
+        if app.state.replica_pool:
+            engines += app.state.replica_pool.engines
+        for engine in engines:
+            await dispose_engine(engine)
+
+    rate_limiter = create_rate_limiter(settings)
+    # App-level dependencies are solved before the route's own, so throttled
+    # requests never open a session or hash a password.
+    dependencies = [Depends(rate_limiter)] if settings.RATE_LIMIT_ENABLED else []
+    app = FastAPI(lifespan=lifespan, dependencies=dependencies)
+    app.state.settings = settings
+    app.state.rate_limiter = rate_limiter
+    app.state.hashing_service = create_hashing_service(settings)
+    # Created on first use.
+    app.state.engine = app.state.replica_pool = None
+
+    app.include_router(users.router)
+    app.include_router(auth.router)
+    app.include_router(todo.router)
+
+    if settings.METRICS_ENABLED:
+        metrics.install(app)
+
+    if settings.QUERY_INSTRUMENTATION:
+        instrumentation.listen(settings.SLOW_QUERY_THRESHOLD_MS)
+        app.add_middleware(instrumentation.QueryBudgetMiddleware)
+
+    return app
+
+
+def __getattr__(name: str):
+    # `todo_teste.app:app` (uvicorn, `fastapi dev`) is built on first access.
+    if name == 'app':
+        globals()['app'] = app = create_app()
+        return app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
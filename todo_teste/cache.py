@@ -0,0 +1,126 @@
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+
+class TTLCache:
+    """In-process LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            expires_at, value = self._data[key]
+        except KeyError:
+            return default
+
+        if expires_at <= self.timer():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+
+        self._data[key] = (self.timer() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CacheBackend(Protocol):
+    """Storage behind `ResponseCache`; implement it to use an external store.
+
+    Entries belong to a namespace so a whole namespace can be dropped at
+    once. Values are bytes, so any store that holds blobs can back it.
+    """
+
+    async def get(self, namespace, key) -> bytes | None: ...
+
+    async def set(self, namespace, key, value: bytes) -> None: ...
+
+    async def invalidate(self, namespace) -> None: ...
+
+    def stats(self) -> dict: ...
+
+
+class MemoryCacheBackend:
+    """In-process LRU backend with a TTL and a per-namespace key index."""
+
+    def __init__(self, maxsize: int, ttl: float, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._data: OrderedDict = OrderedDict()
+        self._namespaces: dict = {}
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def _remove(self, entry_key):
+        del self._data[entry_key]
+        namespace = entry_key[0]
+        keys = self._namespaces[namespace]
+        keys.discard(entry_key)
+        if not keys:
+            del self._namespaces[namespace]
+
+    async def get(self, namespace, key) -> bytes | None:
+        entry_key = (namespace, key)
+        entry = self._data.get(entry_key)
+        if entry is None:
+            self._stats['misses'] += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self.timer():
+            self._remove(entry_key)
+            self._stats['evictions'] += 1
+            self._stats['misses'] += 1
+            return None
+
+        self._data.move_to_end(entry_key)
+        self._stats['hits'] += 1
+        return value
+
+    async def set(self, namespace, key, value: bytes) -> None:
+        if self.maxsize <= 0:
+            return
+
+        entry_key = (namespace, key)
+        self._data[entry_key] = (self.timer() + self.ttl, value)
+        self._data.move_to_end(entry_key)
+        self._namespaces.setdefault(namespace, set()).add(entry_key)
+        while len(self._data) > self.maxsize:
+            self._remove(next(iter(self._data)))
+            self._stats['evictions'] += 1
+
+    async def invalidate(self, namespace) -> None:
+        for entry_key in self._namespaces.pop(namespace, ()):
+            del self._data[entry_key]
+        self._stats['invalidations'] += 1
+
+    def clear(self):
+        self._data.clear()
+        self._namespaces.clear()
+
+    def stats(self) -> dict:
+        return {**self._stats, 'size': len(self._data)}
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,56 @@
+import hashlib
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request
+
+
+def weak_etag(*parts) -> str:
+    digest = hashlib.sha1(
+        '\0'.join(str(part) for part in parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'W/"{digest[:16]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of `etag` against the request's If-None-Match."""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+
+    candidates = {
+        candidate.strip().removeprefix('W/') for candidate in header.split(',')
+    }
+    return etag.removeprefix('W/') in candidates
+
+
+def http_date(value: datetime) -> str:
+    # Naive datetimes from the database are UTC.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return format_datetime(value.astimezone(UTC), usegmt=True)
+
+
+def not_modified_since(request: Request, last_modified: datetime) -> bool:
+    """True when `last_modified` is not newer than If-Modified-Since.
+
+    A missing or malformed header never matches, and If-None-Match takes
+    precedence over If-Modified-Since as RFC 9110 requires.
+    """
+    header = request.headers.get('if-modified-since')
+    if not header or 'if-none-match' in request.headers:
+        return False
+
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=UTC)
+    # HTTP dates have one-second resolution.
+    return last_modified.replace(microsecond=0) <= since
@@ -1,13 +1,225 @@
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import ResourceClosedError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import HTTPConnection
 
 from todo_teste.settings import Settings
 
-settings = Settings()
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite',
+    'postgresql': 'asyncpg',
+}
+
+
+def async_database_url(url: str) -> str:
+    """Return `url` with its driver swapped for the backend's asyncio driver.
+
+    URLs that already name an asyncio driver (e.g. `postgresql+asyncpg://`)
+    are returned unchanged.
+    """
+    database_url = make_url(url)
+    backend = database_url.get_backend_name()
+    driver = database_url.get_driver_name()
+
+    if backend not in ASYNC_DRIVERS or driver == ASYNC_DRIVERS[backend]:
+        return database_url.render_as_string(hide_password=False)
+
+    return database_url.set(
+        drivername=f'{backend}+{ASYNC_DRIVERS[backend]}'
+    ).render_as_string(hide_password=False)
+
+
+class ThreadPoolResult:
+    """Awaitable facade over a sync `Result`, mirroring `AsyncResult`."""
+
+    def __init__(self, result):
+        self.sync_result = result
+
+    async def partitions(self, size: int):
+        while True:
+            rows = await run_in_threadpool(self.sync_result.fetchmany, size)
+            if not rows:
+                return
+            yield rows
+
+
+class ThreadPoolSession:
+    """Awaitable facade over a sync `Session`.
+
+    Exposes the subset of the `AsyncSession` API used by the routers and runs
+    every call that may hit the database on the threadpool, so the same
+    `async def` routes work in both `DATABASE_MODE`s.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def bind(self):
+        return self.sync_session.bind
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    def _execute_buffered(self, statement, params, **kwargs):
+        # Like `AsyncSession`, fetch rows before returning, so reading them
+        # later never does I/O on the event loop.
+        result = self.sync_session.execute(statement, params, **kwargs)
+        try:
+            result.keys()
+        except ResourceClosedError:
+            # DML without RETURNING: nothing to buffer.
+            return result
+        return result.freeze()()
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(
+            self._execute_buffered, statement, params, **kwargs
+        )
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(
+            self.sync_session.scalar, statement, params, **kwargs
+        )
+
+    async def scalars(self, statement, params=None, **kwargs):
+        result = await self.execute(statement, params, **kwargs)
+        return result.scalars()
+
+    async def stream(self, statement, params=None, **kwargs):
+        result = await run_in_threadpool(
+            self.sync_session.execute,
+            statement.execution_options(stream_results=True),
+            params,
+            **kwargs,
+        )
+        return ThreadPoolResult(result)
+
+    async def connection(self):
+        return await run_in_threadpool(self.sync_session.connection)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def refresh(self, instance):
+        await run_in_threadpool(self.sync_session.refresh, instance)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+def sqlite_pragmas(settings: Settings) -> dict[str, str | int]:
+    return {
+        'journal_mode': settings.SQLITE_JOURNAL_MODE,
+        'synchronous': settings.SQLITE_SYNCHRONOUS,
+        'cache_size': settings.SQLITE_CACHE_SIZE,
+        'mmap_size': settings.SQLITE_MMAP_SIZE,
+        'busy_timeout': settings.SQLITE_BUSY_TIMEOUT,
+        'temp_store': settings.SQLITE_TEMP_STORE,
+    }
+
+
+def engine_options(settings: Settings) -> dict:
+    database_url = make_url(settings.DATABASE_URL)
+    options = {
+        'pool_pre_ping': settings.DATABASE_POOL_PRE_PING,
+        'pool_recycle': settings.DATABASE_POOL_RECYCLE,
+    }
+
+    # In-memory SQLite runs on a single shared connection, so there is no
+    # pool to size.
+    in_memory = database_url.get_backend_name() == 'sqlite' and (
+        database_url.database in {None, '', ':memory:'}
+    )
+    if not in_memory:
+        options['pool_size'] = settings.DATABASE_POOL_SIZE
+        options['max_overflow'] = settings.DATABASE_MAX_OVERFLOW
+
+    return options
+
+
+def create_database_engine(settings: Settings):
+    """Build the engine for `settings.DATABASE_MODE`.
+
+    Returns an `AsyncEngine` in async mode and a plain `Engine` otherwise.
+    SQLite connections get `sqlite_pragmas` applied as they are opened.
+    """
+    if settings.DATABASE_MODE == 'async':
+        engine = create_async_engine(
+            async_database_url(settings.DATABASE_URL), **engine_options(settings)
+        )
+        sync_engine = engine.sync_engine
+    else:
+        engine = sync_engine = create_engine(
+            settings.DATABASE_URL, **engine_options(settings)
+        )
+
+    if sync_engine.dialect.name == 'sqlite':
+        pragmas = sqlite_pragmas(settings)
+
+        @event.listens_for(sync_engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+            cursor.close()
+
+    return engine
+
+
+def get_app_settings(connection: HTTPConnection) -> Settings:
+    """The settings the serving app was built with (see `create_app`)."""
+    return connection.app.state.settings
+
+
+def app_engine(app):
+    """`app`'s engine, created from its settings on first use."""
+    if app.state.engine is None:
+        app.state.engine = create_database_engine(app.state.settings)
+    return app.state.engine
+
+
+async def dispose_engine(engine):
+    if isinstance(engine, AsyncEngine):
+        await engine.dispose()
+    else:
+        await run_in_threadpool(engine.dispose)
+
 
-engine = create_engine(settings.DATABASE_URL)
+@asynccontextmanager
+async def open_session(bind):
+    """Open the session type matching `bind`, an engine from this module."""
+    if isinstance(bind, AsyncEngine):
+        async with AsyncSession(bind, expire_on_commit=False) as session:
+            yield session
+    else:
+        session = ThreadPoolSession(Session(bind, expire_on_commit=False))
+        try:
+            yield session
+        finally:
+            await session.close()
 
 
-def get_session():
-    with Session(engine) as session:
+async def get_session(connection: HTTPConnection):
+    async with open_session(app_engine(connection.app)) as session:
         yield session
@@ -0,0 +1,235 @@
+"""In-process fan-out of todo change events to each user's open streams."""
+
+import asyncio
+import signal
+import threading
+from collections import deque
+from collections.abc import Callable
+from contextlib import contextmanager
+from typing import Protocol
+
+import orjson
+from starlette.responses import Response
+
+from todo_teste.pagination import encode_cursor
+from todo_teste.serialization import TODO_FIELDS
+
+
+class EventBroker(Protocol):
+    """Carries events between workers, e.g. over Redis pub/sub.
+
+    `publish` sends a user's event to every worker; between `start` and
+    `stop` the broker calls `deliver(user_id, message)` for each event
+    published by any worker, this one included.
+    """
+
+    async def publish(self, user_id: int, message: bytes) -> None: ...
+
+    async def start(self, deliver: Callable[[int, bytes], None]) -> None: ...
+
+    async def stop(self) -> None: ...
+
+
+class Subscription:
+    """One connection's queue of pending events, oldest dropped when full.
+
+    Idle streams are the common case, so the queue is only allocated on
+    the first event and waiting costs a single future.
+    """
+
+    __slots__ = ('_maxsize', '_messages', '_waiter', 'closed', 'dropped')
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._messages = None
+        self._waiter = None
+        self.closed = False
+        self.dropped = 0
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def put(self, message: bytes):
+        if self._messages is None:
+            self._messages = deque(maxlen=self._maxsize)
+        elif len(self._messages) == self._maxsize:
+            self.dropped += 1
+        self._messages.append(message)
+        self._wake()
+
+    def close(self):
+        self.closed = True
+        self._wake()
+
+    async def get(self) -> bytes | None:
+        """Wait for the next event; `None` once the subscription is closed."""
+        while not self._messages:
+            if self.closed:
+                return None
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._messages.popleft()
+
+
+def event_json(event: str, version: int, *, todos=(), ids=()) -> bytes:
+    """Serialize an event; `todos` are ORM objects, `ids` deleted todo ids."""
+    message = {'event': event, 'watermark': encode_cursor({'version': version})}
+    if todos:
+        message['todos'] = [
+            {field: getattr(todo, field) for field in TODO_FIELDS} for todo in todos
+        ]
+    if ids:
+        message['ids'] = list(ids)
+    return orjson.dumps(message)
+
+
+class TodoEvents:
+    def __init__(self, queue_size: int, broker: EventBroker | None = None):
+        self.queue_size = queue_size
+        self.broker = broker
+        self._subscriptions: dict[int, set[Subscription]] = {}
+
+    async def start(self):
+        if self.broker is not None:
+            await self.broker.start(self.deliver)
+
+    async def stop(self):
+        if self.broker is not None:
+            await self.broker.stop()
+
+    async def publish(self, user_id: int, event: str, version: int, **payload):
+        if self.broker is None:
+            # Only this worker's streams can listen; skip serializing when
+            # there are none.
+            if user_id in self._subscriptions:
+                self.deliver(user_id, event_json(event, version, **payload))
+            return
+        await self.broker.publish(user_id, event_json(event, version, **payload))
+
+    def deliver(self, user_id: int, message: bytes):
+        # Every subscriber shares the same bytes.
+        for subscription in self._subscriptions.get(user_id, ()):
+            subscription.put(message)
+
+    @contextmanager
+    def subscribe(self, user_id: int):
+        subscription = Subscription(self.queue_size)
+        self._subscriptions.setdefault(user_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscriptions = self._subscriptions[user_id]
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[user_id]
+
+    def close_all(self):
+        """End every open stream, e.g. when the server starts shutting down."""
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.close()
+
+    def connections(self) -> int:
+        return sum(map(len, self._subscriptions.values()))
+
+
+@contextmanager
+def close_on_exit_signals(events: TodoEvents):
+    """Call `events.close_all` when the process is asked to exit.
+
+    uvicorn waits for open connections before it runs the lifespan exit, so
+    open streams would hold up every shutdown for the whole graceful
+    timeout. The handlers found in place, uvicorn's own, still run first.
+    """
+    # Only the main thread can set signal handlers; the test client runs
+    # the app in another one.
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    loop = asyncio.get_running_loop()
+    exit_signals = (signal.SIGINT, signal.SIGTERM)
+    previous = {sig: signal.getsignal(sig) for sig in exit_signals}
+
+    def handle_exit(sig, frame):
+        if callable(previous[sig]):
+            previous[sig](sig, frame)
+        loop.call_soon_threadsafe(events.close_all)
+
+    for sig in exit_signals:
+        signal.signal(sig, handle_exit)
+    try:
+        yield
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+
+
+async def sse_chunks(subscription: Subscription, keepalive: float):
+    """Server-Sent Events framing of a subscription, until it is closed."""
+    yield b': connected\n\n'
+    while True:
+        try:
+            async with asyncio.timeout(keepalive):
+                message = await subscription.get()
+        except TimeoutError:
+            # Keeps proxies from closing an idle stream.
+            yield b': keepalive\n\n'
+            continue
+        if message is None:
+            return
+        yield b'data: ' + message + b'\n\n'
+
+
+class EventStreamResponse(Response):
+    """`text/event-stream` response that follows a user's `Subscription`.
+
+    `StreamingResponse` keeps a task group with two tasks per connection
+    to notice disconnects; here a single watcher task closes the
+    subscription instead, which matters with thousands of idle streams.
+    """
+
+    media_type = 'text/event-stream'
+
+    def __init__(self, events: 'TodoEvents', user_id: int, keepalive: float):
+        self.events = events
+        self.user_id = user_id
+        self.keepalive = keepalive
+        self.status_code = 200
+        self.background = None
+        self.init_headers({'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+    async def __call__(self, scope, receive, send):
+        with self.events.subscribe(self.user_id) as subscription:
+
+            async def close_on_disconnect():
+                while (await receive())['type'] != 'http.disconnect':
+                    pass
+                subscription.close()
+
+            watcher = asyncio.create_task(close_on_disconnect())
+            try:
+                await send({
+                    'type': 'http.response.start',
+                    'status': self.status_code,
+                    'headers': self.raw_headers,
+                })
+                async for chunk in sse_chunks(subscription, self.keepalive):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+                # Closed by a disconnect, where the server drops this, or by
+                # `close_all`.
+                await send({'type': 'http.response.body', 'body': b''})
+            finally:
+                watcher.cancel()
+
+
+# Sized by `create_app`.
+todo_events = TodoEvents(queue_size=0)
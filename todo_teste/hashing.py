@@ -0,0 +1,148 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from http import HTTPStatus
+
+from fastapi import HTTPException
+from pwdlib import PasswordHash
+from starlette.requests import HTTPConnection
+
+from todo_teste.settings import Settings
+
+
+@lru_cache
+def get_password_hasher() -> PasswordHash:
+    # Built on first use: it loads argon2, which import time doesn't need.
+    return PasswordHash.recommended()
+
+
+def get_password_hash(password: str):
+    return get_password_hasher().hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str):
+    return get_password_hasher().verify(plain_password, hashed_password)
+
+
+def _timed(operation, *args):
+    # Runs inside the worker; wall-clock time is comparable across processes.
+    started_at = time.time()
+    result = operation(*args)
+    return result, started_at, time.time()
+
+
+@dataclass
+class HashingStats:
+    submitted: int = 0
+    rejected: int = 0
+    completed: int = 0
+    in_flight: int = 0
+    queue_wait_seconds_total: float = 0.0
+    queue_wait_seconds_max: float = 0.0
+    hash_seconds_total: float = 0.0
+    hash_seconds_max: float = 0.0
+
+
+class HashingService:
+    """Runs argon2 hash/verify calls off the event loop on a bounded pool.
+
+    At most `workers + max_queue` calls may be in flight; beyond that new
+    calls are rejected with 503 and a Retry-After header instead of queueing
+    without limit. Callables in `listeners` are called with the operation
+    name, queue wait and hash time of every completed call.
+    """
+
+    def __init__(
+        self,
+        *,
+        executor: str = 'process',
+        workers: int | None = None,
+        max_queue: int = 64,
+        retry_after: int = 1,
+    ):
+        self.executor_kind = executor
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = self.workers + max_queue
+        self.retry_after = retry_after
+        self._executor: Executor | None = None
+        self._stats = HashingStats()
+        self.listeners: list[Callable[[str, float, float], None]] = []
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == 'process':
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _submit(self, name: str, operation, *args):
+        if self._stats.in_flight >= self.capacity:
+            self._stats.rejected += 1
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail='Too many concurrent password operations',
+                headers={'Retry-After': str(self.retry_after)},
+            )
+
+        self._stats.submitted += 1
+        self._stats.in_flight += 1
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        try:
+            result, started_at, finished_at = await loop.run_in_executor(
+                self._get_executor(), _timed, operation, *args
+            )
+        finally:
+            self._stats.in_flight -= 1
+
+        queue_wait = max(started_at - submitted_at, 0.0)
+        hash_time = finished_at - started_at
+        self._stats.completed += 1
+        self._stats.queue_wait_seconds_total += queue_wait
+        self._stats.queue_wait_seconds_max = max(
+            self._stats.queue_wait_seconds_max, queue_wait
+        )
+        self._stats.hash_seconds_total += hash_time
+        self._stats.hash_seconds_max = max(self._stats.hash_seconds_max, hash_time)
+        for listener in self.listeners:
+            listener(name, queue_wait, hash_time)
+
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._submit('hash', get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(
+            'verify', verify_password, plain_password, hashed_password
+        )
+
+    def stats(self) -> dict:
+        return asdict(self._stats)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def create_hashing_service(settings: Settings) -> HashingService:
+    return HashingService(
+        executor=settings.PASSWORD_HASH_EXECUTOR,
+        workers=settings.PASSWORD_HASH_WORKERS,
+        max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+        retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+    )
+
+
+def get_hashing_service(connection: HTTPConnection) -> HashingService:
+    return connection.app.state.hashing_service
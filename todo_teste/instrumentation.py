@@ -0,0 +1,166 @@
+"""Per-request SQL statement counts, slow-query logging and query budgets."""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_PREFIXES = {'sqlite': 'EXPLAIN QUERY PLAN ', 'postgresql': 'EXPLAIN '}
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    # Statements run under `unbudgeted`, left out of the route's budget.
+    exempt: int = 0
+    seconds: float = 0.0
+    statements: list[str] = field(default_factory=list)
+
+
+query_stats: ContextVar[QueryStats | None] = ContextVar('query_stats', default=None)
+
+_slow_query_seconds: float | None = None
+
+
+def _before_cursor_execute(conn, *args):
+    # A connection runs one statement at a time, so one slot is enough.
+    conn.info['query_started_at'] = time.perf_counter()
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return 'unavailable'
+
+    # A raw DBAPI cursor, so the EXPLAIN itself fires no events.
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return '\n'.join(' '.join(map(str, row)) for row in cursor.fetchall())
+    except Exception:  # noqa: BLE001
+        return 'unavailable'
+    finally:
+        cursor.close()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, *args):
+    executemany = args[-1]
+    elapsed = time.perf_counter() - conn.info['query_started_at']
+
+    stats = query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.statements.append(statement)
+
+    if _slow_query_seconds is not None and elapsed >= _slow_query_seconds:
+        plan = 'unavailable' if executemany else _explain(conn, statement, parameters)
+        logger.warning(
+            'Slow query (%.1f ms): %s\nPlan:\n%s', elapsed * 1000, statement, plan
+        )
+
+
+def listen(slow_query_ms: float | None = None):
+    """Start counting statements on every engine; idempotent.
+
+    When `slow_query_ms` is given, statements taking at least that long are
+    also logged with their plan.
+    """
+    global _slow_query_seconds  # noqa: PLW0603
+    if slow_query_ms is not None:
+        _slow_query_seconds = slow_query_ms / 1000
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+class tracking_queries:  # noqa: N801
+    """Context manager binding a `QueryStats` to the current request.
+
+    Nested uses share the outermost stats, so several middlewares can read
+    the same counts.
+    """
+
+    def __enter__(self) -> QueryStats:
+        stats = query_stats.get()
+        self._token = None
+        if stats is None:
+            stats = QueryStats()
+            self._token = query_stats.set(stats)
+        return stats
+
+    def __exit__(self, *exc_info):
+        if self._token is not None:
+            query_stats.reset(self._token)
+
+
+def query_budget(limit: int):
+    """Declare that a route runs at most `limit` SQL statements per request."""
+
+    def decorator(endpoint):
+        endpoint.query_budget = limit
+        return endpoint
+
+    return decorator
+
+
+@contextmanager
+def unbudgeted():
+    """Leave the statements run inside out of the request's query budget.
+
+    For shared dependencies whose queries depend on cache state rather than
+    on the route, such as the user lookup on a user cache miss.
+    """
+    stats = query_stats.get()
+    count = stats.count if stats is not None else 0
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.exempt += stats.count - count
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryBudgetMiddleware:
+    """Check each request's statement count against its route's budget.
+
+    `mode='warn'` logs overruns; `mode='raise'` raises `QueryBudgetExceeded`
+    after the response is sent, which fails the request in tests.
+    """
+
+    def __init__(self, app, mode: str = 'warn'):
+        self.app = app
+        self.mode = mode
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with tracking_queries() as stats:
+            await self.app(scope, receive, send)
+
+        route = scope.get('route')
+        budget = getattr(getattr(route, 'endpoint', None), 'query_budget', None)
+        count = stats.count - stats.exempt
+        if budget is None or count <= budget:
+            return
+
+        message = (
+            f'{scope["method"]} {route.path} ran {count} SQL statements, '
+            f'over its budget of {budget}:\n' + '\n'.join(stats.statements)
+        )
+        if self.mode == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
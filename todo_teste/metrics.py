@@ -0,0 +1,246 @@
+"""Request, database and password-hashing metrics in Prometheus text format."""
+
+import time
+
+from fastapi import APIRouter, Response
+
+from todo_teste import instrumentation
+from todo_teste.response_cache import response_cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict = {}
+
+    def clear(self):
+        self._values.clear()
+
+    def render(self) -> list[str]:
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+            *self._samples(),
+        ]
+
+    def _samples(self) -> list[str]:
+        return [
+            f'{self.name}{_labels(self.labelnames, labels)} {value}'
+            for labels, value in self._values.items()
+        ]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels):
+        counts = self._values.get(labels)
+        if counts is None:
+            # One count per bucket, then the running sum and total count.
+            counts = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def _samples(self) -> list[str]:
+        lines = []
+        for labels, counts in self._values.items():
+            for bound, count in zip(self.buckets, counts):
+                le = _labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f'{self.name}_bucket{le} {count}')
+            label_text = _labels(self.labelnames, labels)
+            inf = _labels(self.labelnames, labels, 'le="+Inf"')
+            lines.extend([
+                f'{self.name}_bucket{inf} {counts[-1]}',
+                f'{self.name}_sum{label_text} {counts[-2]}',
+                f'{self.name}_count{label_text} {counts[-1]}',
+            ])
+        return lines
+
+
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests handled.', ('method', 'route', 'status')
+)
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Time from receiving a request to sending the last byte of its response.',
+    ('method', 'route'),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'HTTP requests being handled.', ('method',)
+)
+DB_QUERIES = Histogram(
+    'db_queries_per_request',
+    'SQL statements executed per HTTP request.',
+    ('method', 'route'),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_DURATION = Histogram(
+    'db_query_duration_seconds_per_request',
+    'Time spent executing SQL statements per HTTP request.',
+    ('method', 'route'),
+)
+PASSWORD_HASH_DURATION = Histogram(
+    'password_hash_duration_seconds',
+    'Time spent inside argon2 hash/verify calls.',
+    ('operation',),
+)
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    'password_hash_queue_wait_seconds',
+    'Time argon2 calls waited for a free worker.',
+    ('operation',),
+)
+
+METRICS = (
+    REQUESTS,
+    REQUEST_DURATION,
+    REQUESTS_IN_FLIGHT,
+    DB_QUERIES,
+    DB_DURATION,
+    PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_QUEUE_WAIT,
+)
+
+
+RESPONSE_CACHE_COUNTERS = {
+    'hits': 'Todo list responses served from the cache.',
+    'misses': 'Todo list responses not found in the cache.',
+    'evictions': 'Todo list responses evicted for size or age.',
+    'invalidations': 'Per-user todo list cache invalidations.',
+}
+
+
+def _response_cache_lines() -> list[str]:
+    # Read from the cache at scrape time; it keeps its own counters.
+    stats = response_cache.stats()
+    lines = []
+    for key, documentation in RESPONSE_CACHE_COUNTERS.items():
+        name = f'todo_list_cache_{key}_total'
+        lines += [
+            f'# HELP {name} {documentation}',
+            f'# TYPE {name} counter',
+            f'{name} {stats[key]}',
+        ]
+    return [
+        *lines,
+        '# HELP todo_list_cache_size Todo list responses in the cache.',
+        '# TYPE todo_list_cache_size gauge',
+        f'todo_list_cache_size {stats["size"]}',
+    ]
+
+
+def render() -> str:
+    lines = [line for metric in METRICS for line in metric.render()]
+    return '\n'.join(lines + _response_cache_lines()) + '\n'
+
+
+def _observe_password_hash(operation: str, queue_wait: float, hash_time: float):
+    PASSWORD_HASH_QUEUE_WAIT.observe(queue_wait, operation)
+    PASSWORD_HASH_DURATION.observe(hash_time, operation)
+
+
+class MetricsMiddleware:
+    """Times each request until its last body byte and counts its queries.
+
+    Routes are labelled by their path template (`/todo/{todo_id}`), and
+    requests that match no route share the `unmatched` label, so label
+    cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        status = 500
+        REQUESTS_IN_FLIGHT.inc(method)
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            with instrumentation.tracking_queries() as stats:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            route = getattr(scope.get('route'), 'path', 'unmatched')
+            REQUESTS_IN_FLIGHT.dec(method)
+            REQUESTS.inc(method, route, status)
+            REQUEST_DURATION.observe(elapsed, method, route)
+            DB_QUERIES.observe(stats.count, method, route)
+            DB_DURATION.observe(stats.seconds, method, route)
+
+
+router = APIRouter(tags=['metrics'])
+
+
+@router.get('/metrics', include_in_schema=False)
+async def metrics():
+    # Async so rendering runs on the event loop, which owns every update.
+    return Response(render(), media_type=CONTENT_TYPE)
+
+
+def install(app):
+    """Add the middleware, the `/metrics` route and the DB/hashing hooks."""
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(router)
+    instrumentation.listen()
+    listeners = app.state.hashing_service.listeners
+    if _observe_password_hash not in listeners:
+        listeners.append(_observe_password_hash)
@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import DDL, ForeignKey, Index, event, func
 from sqlalchemy.orm import Mapped, mapped_column, registry
 
 table_registry = registry()
@@ -26,6 +26,16 @@ class User:
 @table_registry.mapped_as_dataclass
 class Todo:
     __tablename__ = 'todo'
+    __table_args__ = (
+        Index('ix_todo_user_id_id', 'user_id', 'id'),
+        # One per `TodoFilters.order_by`, ending in id for the tiebreak.
+        Index('ix_todo_user_id_status_id', 'user_id', 'status', 'id'),
+        Index('ix_todo_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        Index('ix_todo_user_id_updated_at_id', 'user_id', 'updated_at', 'id'),
+        Index('ix_todo_user_id_done_at_id', 'user_id', 'done_at', 'id'),
+        Index('ix_todo_user_id_title_id', 'user_id', 'title', 'id'),
+        Index('ix_todo_user_id_change_version', 'user_id', 'change_version'),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     title: Mapped[str]
@@ -36,5 +46,104 @@ class Todo:
         init=False, server_default=func.now(), onupdate=func.now()
     )
     done_at: Mapped[datetime | None] = mapped_column(init=False, nullable=True)
+    # The user's `TodoVersion` as of the last write to this todo.
+    change_version: Mapped[int] = mapped_column(
+        init=False, default=0, server_default='0'
+    )
+
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+
+
+@table_registry.mapped_as_dataclass
+class TodoVersion:
+    """Per-user counter bumped by every write to that user's todos."""
+
+    __tablename__ = 'todo_versions'
 
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'), primary_key=True)
+    version: Mapped[int] = mapped_column(default=0)
+
+
+@table_registry.mapped_as_dataclass
+class TodoTombstone:
+    """A deleted todo, kept so `GET /todo/changes` can report the deletion."""
+
+    __tablename__ = 'todo_tombstones'
+    __table_args__ = (
+        Index('ix_todo_tombstones_user_id_change_version', 'user_id', 'change_version'),
+    )
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    todo_id: Mapped[int]
+    change_version: Mapped[int]
+
+
+@table_registry.mapped_as_dataclass
+class TodoCounts:
+    """Per-user todo counts, kept current by every write to the user's todos.
+
+    `completed` counts done todos with a `done_at`, and `completed_seconds`
+    sums their `done_at - created_at`.
+    """
+
+    __tablename__ = 'todo_counts'
+
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'), primary_key=True)
+    pending: Mapped[int] = mapped_column(default=0)
+    running: Mapped[int] = mapped_column(default=0)
+    done: Mapped[int] = mapped_column(default=0)
+    completed: Mapped[int] = mapped_column(default=0)
+    completed_seconds: Mapped[float] = mapped_column(default=0)
+
+
+@table_registry.mapped_as_dataclass
+class TodoDoneDay:
+    """How many of the user's done todos have `done_at` on `day` (UTC)."""
+
+    __tablename__ = 'todo_done_days'
+
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'), primary_key=True)
+    day: Mapped[date] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column(default=0)
+
+
+# Full-text search over title/description. SQLite keeps an external-content
+# FTS5 table in sync through triggers; Postgres indexes the tsvectors with GIN.
+# The same DDL ships in the Alembic revision that introduced it.
+TODO_SEARCH_DDL = {
+    'sqlite': [
+        'CREATE VIRTUAL TABLE todo_fts USING fts5('
+        "title, description, content='todo', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')",
+        'CREATE TRIGGER todo_fts_ai AFTER INSERT ON todo BEGIN '
+        'INSERT INTO todo_fts(rowid, title, description) '
+        'VALUES (new.id, new.title, new.description); END',
+        'CREATE TRIGGER todo_fts_ad AFTER DELETE ON todo BEGIN '
+        'INSERT INTO todo_fts(todo_fts, rowid, title, description) '
+        "VALUES ('delete', old.id, old.title, old.description); END",
+        'CREATE TRIGGER todo_fts_au AFTER UPDATE OF title, description ON todo '
+        'BEGIN INSERT INTO todo_fts(todo_fts, rowid, title, description) '
+        "VALUES ('delete', old.id, old.title, old.description); "
+        'INSERT INTO todo_fts(rowid, title, description) '
+        'VALUES (new.id, new.title, new.description); END',
+    ],
+    'postgresql': [
+        'CREATE INDEX ix_todo_title_search ON todo '
+        "USING gin (to_tsvector('simple', title))",
+        'CREATE INDEX ix_todo_description_search ON todo '
+        "USING gin (to_tsvector('simple', description))",
+    ],
+}
+
+for dialect, statements in TODO_SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(
+            Todo.__table__, 'after_create', DDL(statement).execute_if(dialect=dialect)
+        )
+
+event.listen(
+    Todo.__table__,
+    'after_drop',
+    DDL('DROP TABLE IF EXISTS todo_fts').execute_if(dialect='sqlite'),
+)
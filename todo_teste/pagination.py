@@ -0,0 +1,33 @@
+import base64
+import binascii
+import json
+from http import HTTPStatus
+
+from fastapi import HTTPException
+
+
+def encode_cursor(position: dict) -> str:
+    """Serialize a page position into an opaque, URL-safe cursor."""
+    payload = json.dumps(position, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        position = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        position = None
+
+    if not isinstance(position, dict):
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor')
+
+    return position
+
+
+def cursor_value(cursor: str, key: str) -> int:
+    value = decode_cursor(cursor).get(key)
+    if not isinstance(value, int):
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor')
+
+    return value
@@ -0,0 +1,133 @@
+"""Token-bucket rate limiting per client IP and per route."""
+
+import math
+import time
+from http import HTTPStatus
+from typing import NamedTuple, Protocol
+
+import jwt
+from fastapi import HTTPException
+from starlette.requests import HTTPConnection
+
+from todo_teste.settings import Settings
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600}
+
+
+class Limit(NamedTuple):
+    rate: float
+    burst: int
+
+
+def parse_limit(limit: str) -> Limit:
+    count, _, period = limit.partition('/')
+    if period not in PERIODS or not count.isdigit() or int(count) < 1:
+        raise ValueError(f'Invalid rate limit {limit!r}')
+    return Limit(rate=int(count) / PERIODS[period], burst=int(count))
+
+
+class RateLimitStore(Protocol):
+    """Bucket storage; implement it over e.g. Redis to share limits."""
+
+    async def take(self, key: str, limit: Limit) -> float:
+        """Take a token from `key`'s bucket.
+
+        Returns 0 if one was available, otherwise the seconds until one is.
+        """
+        ...
+
+
+class MemoryRateLimitStore:
+    """In-process buckets, the least recently used dropped past `maxsize`.
+
+    A bucket idle long enough to be dropped has usually refilled anyway.
+    """
+
+    def __init__(self, maxsize: int, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.timer = timer
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    async def take(self, key: str, limit: Limit) -> float:
+        now = self.timer()
+        # Popping and reinserting keeps the dict in least-recently-used order.
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            tokens = limit.burst
+        else:
+            tokens, updated_at = bucket
+            tokens = min(limit.burst, tokens + (now - updated_at) * limit.rate)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / limit.rate
+
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.maxsize:
+            del self._buckets[next(iter(self._buckets))]
+        return wait
+
+    def clear(self):
+        self._buckets.clear()
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class RateLimiter:
+    def __init__(self, store: RateLimitStore, settings: Settings):
+        self.store = store
+        self.settings = settings
+        self.per_ip = (
+            parse_limit(settings.RATE_LIMIT_PER_IP)
+            if settings.RATE_LIMIT_PER_IP
+            else None
+        )
+        self.per_route = {
+            name: parse_limit(limit) for name, limit in settings.RATE_LIMITS.items()
+        }
+
+    def _client(self, connection: HTTPConnection, address: str) -> str:
+        scheme, _, token = connection.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and token:
+            try:
+                payload = jwt.decode(
+                    token,
+                    self.settings.SECRET_KEY,
+                    algorithms=[self.settings.ALGORITHM],
+                )
+            except jwt.PyJWTError:
+                pass
+            else:
+                if payload.get('sub'):
+                    return f'user:{payload["sub"]}'
+        return f'ip:{address}'
+
+    async def _take(self, key: str, limit: Limit):
+        wait = await self.store.take(key, limit)
+        if wait:
+            raise HTTPException(
+                status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                detail='Too many requests',
+                headers={'Retry-After': str(math.ceil(wait))},
+            )
+
+    async def __call__(self, connection: HTTPConnection):
+        address = connection.client.host if connection.client else 'unknown'
+        if self.per_ip is not None:
+            await self._take(f'ip:{address}', self.per_ip)
+
+        # Route names default to the endpoint function's name.
+        name = getattr(connection.scope.get('endpoint'), '__name__', None)
+        limit = self.per_route.get(name)
+        if limit is not None:
+            client = self._client(connection, address)
+            await self._take(f'{name}:{client}', limit)
+
+
+def create_rate_limiter(settings: Settings) -> RateLimiter:
+    return RateLimiter(
+        MemoryRateLimitStore(maxsize=settings.RATE_LIMIT_STORE_SIZE), settings
+    )
@@ -0,0 +1,113 @@
+"""Round-robin routing of read-only routes to `READ_REPLICA_URLS`."""
+
+import itertools
+import logging
+import time
+
+import jwt
+from fastapi import Depends, Request
+from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy.exc import DBAPIError
+
+from todo_teste.cache import TTLCache
+from todo_teste.database import create_database_engine, get_session, open_session
+from todo_teste.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaPool:
+    """Replica engines handed out in turn, skipping ones marked down.
+
+    A replica that fails to connect is marked down for `retry_after`
+    seconds and then tried again. Connections are checked on checkout
+    (`DATABASE_POOL_PRE_PING`), so a dead replica is noticed before a
+    query is sent to it.
+    """
+
+    def __init__(self, engines: list, retry_after: float, timer=time.monotonic):
+        self.engines = engines
+        self.retry_after = retry_after
+        self.timer = timer
+        self._down_until = {}
+        self._turn = itertools.count()
+
+    def healthy(self) -> list:
+        now = self.timer()
+        return [
+            engine for engine in self.engines if self._down_until.get(engine, 0) <= now
+        ]
+
+    def candidates(self) -> list:
+        """Healthy replicas, starting from the next one in turn."""
+        healthy = self.healthy()
+        if not healthy:
+            return []
+        start = next(self._turn) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def mark_down(self, engine):
+        logger.warning('Read replica %s is down', engine.url)
+        self._down_until[engine] = self.timer() + self.retry_after
+
+
+def create_replica_pool(settings: Settings) -> ReplicaPool:
+    return ReplicaPool(
+        [
+            create_database_engine(settings.model_copy(update={'DATABASE_URL': url}))
+            for url in settings.READ_REPLICA_URLS
+        ],
+        retry_after=settings.READ_REPLICA_RETRY_AFTER,
+    )
+
+
+def get_replica_pool(app) -> ReplicaPool:
+    """`app`'s replica pool, created from its settings on first use."""
+    if app.state.replica_pool is None:
+        app.state.replica_pool = create_replica_pool(app.state.settings)
+    return app.state.replica_pool
+
+
+# Token subjects that wrote recently, one entry per user and sized by
+# `create_app`. Per process: with several workers, a write
+# is only seen by the worker that served it.
+recent_writes = TTLCache(maxsize=0, ttl=0)
+
+
+def record_write(*subjects: str):
+    """Send reads by these token subjects to the primary for a while."""
+    for subject in subjects:
+        recent_writes.set(subject, True)
+
+
+def _token_subject(request: Request) -> str | None:
+    scheme, token = get_authorization_scheme_param(request.headers.get('Authorization'))
+    if scheme.lower() != 'bearer':
+        return None
+    # Only picks a database; `get_current_user` still verifies the token, so
+    # a forged one can at most send its own reads to the primary.
+    try:
+        payload = jwt.decode(token, options={'verify_signature': False})
+    except jwt.PyJWTError:
+        return None
+    return payload.get('sub')
+
+
+async def get_read_session(request: Request, session=Depends(get_session)):
+    subject = _token_subject(request)
+    if subject is not None and recent_writes.get(subject):
+        yield session
+        return
+
+    replica_pool = get_replica_pool(request.app)
+    for engine in replica_pool.candidates():
+        async with open_session(engine) as replica_session:
+            try:
+                await replica_session.connection()
+            except DBAPIError:
+                replica_pool.mark_down(engine)
+                continue
+            yield replica_session
+            return
+
+    yield session
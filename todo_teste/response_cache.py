@@ -0,0 +1,29 @@
+from todo_teste.cache import CacheBackend, MemoryCacheBackend
+
+
+class ResponseCache:
+    """Serialized `GET /todo/` responses, namespaced per user.
+
+    Keys carry the user's todo version, so an entry can never outlive a
+    write even when another process made it; `invalidate` also frees the
+    user's entries right away in this process.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    async def get(self, user_id: int, version: int, query: str) -> bytes | None:
+        return await self.backend.get(user_id, (version, query))
+
+    async def set(self, user_id: int, version: int, query: str, body: bytes):
+        await self.backend.set(user_id, (version, query), body)
+
+    async def invalidate(self, user_id: int):
+        await self.backend.invalidate(user_id)
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+
+# Sized by `create_app`.
+response_cache = ResponseCache(MemoryCacheBackend(maxsize=0, ttl=0))
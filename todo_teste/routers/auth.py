@@ -3,28 +3,35 @@ from http import HTTPStatus
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from todo_teste.database import get_session
+from todo_teste.database import get_app_settings, get_session
+from todo_teste.hashing import HashingService, get_hashing_service
+from todo_teste.instrumentation import query_budget
 from todo_teste.models import User
-from todo_teste.schemas import Token
-from todo_teste.security import create_access_token, verify_password
+from todo_teste.schemas import Token, UserPublic
+from todo_teste.security import create_access_token, user_cache, user_claims
+from todo_teste.settings import Settings
 
 router = APIRouter(prefix='/auth', tags=['auth'])
 
 
 @router.post('/token', response_model=Token)
-def login_access_token(
+@query_budget(1)
+async def login_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
+    hashing_service: HashingService = Depends(get_hashing_service),
+    settings: Settings = Depends(get_app_settings),
 ):
-    user = session.scalar(select(User).where(User.email == form_data.username))
+    user = await session.scalar(select(User).where(User.email == form_data.username))
 
-    if not user or not verify_password(form_data.password, user.password):
+    if not user or not await hashing_service.verify(form_data.password, user.password):
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail='Incorrect email or password',
         )
-    access_token = create_access_token(data={'sub': user.email})
+    access_token = create_access_token(data=user_claims(user), settings=settings)
+    user_cache.set(user.email, UserPublic.model_validate(user))
 
     return {'access_token': access_token, 'token_type': 'Bearer'}
@@ -1,107 +1,703 @@
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta
 from http import HTTPStatus
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketException,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from todo_teste.database import get_session
-from todo_teste.models import Todo, TodoStatus
+from todo_teste.conditional import (
+    etag_matches,
+    http_date,
+    not_modified_since,
+    weak_etag,
+)
+from todo_teste.database import get_app_settings, get_session
+from todo_teste.events import EventStreamResponse, todo_events
+from todo_teste.instrumentation import query_budget
+from todo_teste.models import (
+    Todo,
+    TodoCounts,
+    TodoDoneDay,
+    TodoStatus,
+    TodoTombstone,
+)
+from todo_teste.pagination import cursor_value, encode_cursor
+from todo_teste.replicas import get_read_session, record_write
+from todo_teste.response_cache import response_cache
 from todo_teste.schemas import (
     Message,
+    TodoBulk,
+    TodoBulkDeleted,
+    TodoBulkIds,
+    TodoBulkResult,
+    TodoBulkUpdate,
+    TodoChanges,
     TodoFilters,
+    TodoImportResult,
     TodoList,
     TodoPublic,
     TodoSchema,
+    TodoStats,
 )
+from todo_teste.search import apply_text_search
 from todo_teste.security import get_current_user
+from todo_teste.serialization import (
+    TODO_COLUMNS,
+    todo_changes_json,
+    todo_list_json,
+)
+from todo_teste.settings import Settings
+from todo_teste.sorting import apply_sort, cursor_position, next_cursor
+from todo_teste.stats import COUNTERS, TodoState, record_todo_changes, todo_state
+from todo_teste.transfer import EXPORT_FIELDS, MEDIA_TYPES, encode_rows, parse_todos
+from todo_teste.versions import bump_todo_version, get_todo_version
 
 router = APIRouter(prefix='/todo', tags=['todo'])
 
 
+def _todo_update_values(todo_database: Todo, todo: TodoSchema) -> dict:
+    done_at = todo_database.done_at
+    if todo.status == TodoStatus.done and done_at is None:
+        done_at = datetime.utcnow()
+    if todo.status != TodoStatus.done:
+        done_at = None
+
+    return {
+        'title': todo.title,
+        'description': todo.description,
+        'status': todo.status,
+        'done_at': done_at,
+    }
+
+
+def _filter_todos(query, filters: TodoFilters, dialect_name: str, search_mode: str):
+    if filters.status:
+        query = query.where(Todo.status == filters.status)
+
+    return apply_text_search(query, filters, dialect_name, search_mode)
+
+
+def _check_bulk_size(items: list, settings: Settings):
+    if len(items) > settings.TODO_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            detail=f'At most {settings.TODO_BULK_MAX_ITEMS} items per request',
+        )
+
+
+def _validate_bulk_items(items: list[dict], schema: type[BaseModel]):
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as exc:
+            errors.append({
+                'index': index,
+                'detail': exc.errors(
+                    include_url=False, include_context=False, include_input=False
+                ),
+            })
+    return valid, errors
+
+
 @router.post('/', response_model=TodoPublic)
-def create_todo(
+@query_budget(4)
+async def create_todo(
     todo: TodoSchema,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ):
+    version = await bump_todo_version(session, current_user.id)
     todo_database = Todo(
         title=todo.title,
         description=todo.description,
         status=todo.status,
         user_id=current_user.id,
     )
+    todo_database.change_version = version
 
     session.add(todo_database)
-    session.commit()
-    session.refresh(todo_database)
+    await record_todo_changes(
+        session, current_user.id, [(None, TodoState(todo.status, None, None))]
+    )
+    await session.commit()
+    await response_cache.invalidate(current_user.id)
+    record_write(current_user.email)
+    await session.refresh(todo_database)
+    await todo_events.publish(
+        current_user.id, 'created', version, todos=[todo_database]
+    )
 
     return todo_database
 
 
 @router.get('/', response_model=TodoList)
-def list_todo(
-    session: Session = Depends(get_session),
+@query_budget(2)
+async def list_todo(
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
     current_user=Depends(get_current_user),
     filters: TodoFilters = Depends(),
+    settings: Settings = Depends(get_app_settings),
 ):
-    query = select(Todo).where(Todo.user_id == current_user.id)
+    # The version is read before the list, so a concurrent write can only
+    # make the ETag older than the page, never newer.
+    version = await get_todo_version(session, current_user.id)
+    cache_key = filters.model_dump_json()
+    etag = weak_etag(current_user.id, version, cache_key)
+    if etag_matches(request, etag):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers={'ETag': etag})
+
+    body = await response_cache.get(current_user.id, version, cache_key)
+    if body is None:
+        body = await _list_todo_body(
+            session, current_user.id, filters, settings.TODO_SEARCH_MODE
+        )
+        await response_cache.set(current_user.id, version, cache_key, body)
+
+    return Response(body, media_type='application/json', headers={'ETag': etag})
+
+
+async def _list_todo_body(
+    session: AsyncSession, user_id: int, filters: TodoFilters, search_mode: str
+):
+    query, rank = _filter_todos(
+        select(*TODO_COLUMNS).where(Todo.user_id == user_id),
+        filters,
+        session.bind.dialect.name,
+        search_mode,
+    )
+
+    if rank is not None and filters.order_by is None:
+        # Relevance is not a stable sort key, so ranked pages resume by offset.
+        offset = (
+            cursor_value(filters.cursor, 'offset') if filters.cursor else filters.offset
+        )
+        query = query.order_by(rank, Todo.id).offset(offset).limit(filters.limit)
+    else:
+        # Sorting on an indexed (column, id) key makes pages stable and lets a
+        # cursor resume with an index range scan instead of skipping `offset`
+        # rows.
+        position = cursor_position(filters) if filters.cursor else None
+        query = apply_sort(query, filters, position)
+
+    rows = (await session.execute(query)).all()
+
+    cursor = None
+    if rows and len(rows) == filters.limit:
+        if rank is not None and filters.order_by is None:
+            cursor = encode_cursor({'offset': (offset or 0) + len(rows)})
+        else:
+            cursor = next_cursor(rows[-1], filters)
+
+    return todo_list_json(rows, cursor)
+
+
+@router.get('/changes', response_model=TodoChanges)
+@query_budget(3)
+async def list_todo_changes(
+    session: AsyncSession = Depends(get_read_session),
+    current_user=Depends(get_current_user),
+    since: str | None = None,
+):
+    # Clients apply `deleted` before `todos`: ids can be reused.
+    since_version = cursor_value(since, 'version') if since else None
+    # Read first and used as the upper bound: a write committed after this
+    # read is left whole for the next call instead of being half reported.
+    version = await get_todo_version(session, current_user.id)
+
+    query = select(*TODO_COLUMNS).where(
+        Todo.user_id == current_user.id, Todo.change_version <= version
+    )
+    deleted = []
+    if since_version is not None:
+        query = query.where(Todo.change_version > since_version)
+        deleted = (
+            await session.scalars(
+                select(TodoTombstone.todo_id)
+                .where(
+                    TodoTombstone.user_id == current_user.id,
+                    TodoTombstone.change_version > since_version,
+                    TodoTombstone.change_version <= version,
+                )
+                .order_by(TodoTombstone.change_version, TodoTombstone.id)
+            )
+        ).all()
+    rows = (await session.execute(query.order_by(Todo.change_version, Todo.id))).all()
+
+    body = todo_changes_json(rows, deleted, encode_cursor({'version': version}))
+    return Response(body, media_type='application/json')
+
+
+@router.get('/stats', response_model=TodoStats)
+@query_budget(2)
+async def todo_stats(
+    session: AsyncSession = Depends(get_read_session),
+    current_user=Depends(get_current_user),
+    days: int = Query(30, ge=1, le=366),
+):
+    counts = (
+        await session.execute(
+            select(*(getattr(TodoCounts, name) for name in COUNTERS)).where(
+                TodoCounts.user_id == current_user.id
+            )
+        )
+    ).first()
+    first_day = datetime.utcnow().date() - timedelta(days=days - 1)
+    completed_per_day = (
+        await session.execute(
+            select(TodoDoneDay.day, TodoDoneDay.count)
+            .where(
+                TodoDoneDay.user_id == current_user.id,
+                TodoDoneDay.day >= first_day,
+                TodoDoneDay.count > 0,
+            )
+            .order_by(TodoDoneDay.day)
+        )
+    ).all()
+
+    by_status = {
+        status: getattr(counts, status.name, 0) if counts else 0
+        for status in TodoStatus
+    }
+    return {
+        'total': sum(by_status.values()),
+        'by_status': by_status,
+        'completed_per_day': [row._asdict() for row in completed_per_day],
+        'average_seconds_to_done': (
+            counts.completed_seconds / counts.completed
+            if counts and counts.completed
+            else None
+        ),
+    }
+
+
+@router.get('/stream')
+@query_budget(0)
+async def stream_todo_events(
+    session: AsyncSession = Depends(get_read_session),
+    current_user=Depends(get_current_user),
+    settings: Settings = Depends(get_app_settings),
+):
+    # The stream can stay open for hours; don't hold a connection for it.
+    await session.close()
+
+    return EventStreamResponse(
+        todo_events, current_user.id, settings.TODO_STREAM_KEEPALIVE
+    )
+
+
+@router.websocket('/ws')
+async def todo_events_websocket(
+    websocket: WebSocket,
+    token: str = Query(),
+    session: AsyncSession = Depends(get_session),
+    settings: Settings = Depends(get_app_settings),
+):
+    # Browsers can't set headers on a WebSocket, hence the `token` parameter.
+    try:
+        current_user = await get_current_user(session, token, settings)
+    except HTTPException:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
+    finally:
+        await session.close()
+
+    await websocket.accept()
+    with todo_events.subscribe(current_user.id) as subscription:
+
+        async def close_on_disconnect():
+            try:
+                while (await websocket.receive())['type'] != 'websocket.disconnect':
+                    pass
+            finally:
+                subscription.close()
+
+        receiving = asyncio.create_task(close_on_disconnect())
+        try:
+            while (message := await subscription.get()) is not None:
+                await websocket.send_text(message.decode())
+            if not receiving.done():
+                # Closed by `close_all`: the server is shutting down.
+                await websocket.close(code=status.WS_1001_GOING_AWAY)
+        finally:
+            receiving.cancel()
 
-    if filters.title:
-        query = query.where(Todo.title.contains(filters.title))
-    if filters.description:
-        query = query.where(Todo.description.contains(filters.description))
-    if filters.status:
-        query = query.where(Todo.status == filters.status)
 
-    todos = session.scalars(query.offset(filters.offset).limit(filters.limit)).all()
+@router.get('/export')
+@query_budget(1)
+async def export_todos(
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+    filters: TodoFilters = Depends(),
+    export_format: Literal['ndjson', 'csv'] = Query('ndjson', alias='format'),
+    settings: Settings = Depends(get_app_settings),
+):
+    # Pagination fields of `filters` are ignored.
+    query, _ = _filter_todos(
+        select(*(getattr(Todo, field) for field in EXPORT_FIELDS)).where(
+            Todo.user_id == current_user.id
+        ),
+        filters,
+        session.bind.dialect.name,
+        settings.TODO_SEARCH_MODE,
+    )
+    query = query.order_by(Todo.id).execution_options(
+        yield_per=settings.TODO_EXPORT_BATCH_SIZE
+    )
+
+    async def rows():
+        # The body outlives the dependency's session scope, so the stream
+        # owns the connection it checks out and releases it when done.
+        try:
+            if export_format == 'csv':
+                yield encode_rows([EXPORT_FIELDS], 'csv')
+
+            result = await session.stream(query)
+            async for partition in result.partitions(settings.TODO_EXPORT_BATCH_SIZE):
+                yield encode_rows(partition, export_format)
+        finally:
+            await session.close()
+
+    return StreamingResponse(
+        rows(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="todos.{export_format}"'
+        },
+    )
+
+
+@router.post('/import', response_model=TodoImportResult)
+async def import_todos(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+    import_format: Literal['ndjson', 'csv'] = Query('ndjson', alias='format'),
+    settings: Settings = Depends(get_app_settings),
+):
+    imported = failed = 0
+    errors, batch = [], []
+
+    async def flush():
+        nonlocal imported
+        version = await bump_todo_version(session, current_user.id)
+        await session.execute(
+            insert(Todo), [{**row, 'change_version': version} for row in batch]
+        )
+        await record_todo_changes(
+            session,
+            current_user.id,
+            [(None, TodoState(row['status'], None, None)) for row in batch],
+        )
+        await session.commit()
+        await response_cache.invalidate(current_user.id)
+        record_write(current_user.email)
+        # No rows to send: streams fetch them through `GET /todo/changes`.
+        await todo_events.publish(current_user.id, 'imported', version)
+        imported += len(batch)
+        batch.clear()
+
+    async for line, todo, error in parse_todos(request.stream(), import_format):
+        if error is not None:
+            failed += 1
+            if len(errors) < settings.TODO_IMPORT_MAX_ERRORS:
+                errors.append({'line': line, 'detail': error})
+            continue
+
+        batch.append({**todo.model_dump(), 'user_id': current_user.id})
+        if len(batch) >= settings.TODO_IMPORT_BATCH_SIZE:
+            await flush()
+
+    if batch:
+        await flush()
+
+    return {'imported': imported, 'failed': failed, 'errors': errors}
+
+
+@router.post('/bulk', response_model=TodoBulkResult)
+@query_budget(3)
+async def create_todos_bulk(
+    bulk: TodoBulk,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+    settings: Settings = Depends(get_app_settings),
+):
+    _check_bulk_size(bulk.todos, settings)
+    valid, errors = _validate_bulk_items(bulk.todos, TodoSchema)
+
+    todos = []
+    if valid:
+        # One multi-row INSERT ... RETURNING instead of a round trip per item.
+        # Asking SQLAlchemy for parameter order would make it fall back to
+        # one INSERT per row on SQLite, which has no sentinel column; ids of
+        # a single INSERT are assigned in row order, so sort by them instead.
+        version = await bump_todo_version(session, current_user.id)
+        result = await session.scalars(
+            insert(Todo).returning(Todo),
+            [
+                {
+                    **todo.model_dump(),
+                    'user_id': current_user.id,
+                    'change_version': version,
+                }
+                for _, todo in valid
+            ],
+        )
+        todos = sorted(result.all(), key=lambda todo: todo.id)
+        await record_todo_changes(
+            session, current_user.id, [(None, todo_state(todo)) for todo in todos]
+        )
+        await session.commit()
+        await response_cache.invalidate(current_user.id)
+        record_write(current_user.email)
+        await todo_events.publish(current_user.id, 'created', version, todos=todos)
+
+    return {'todos': todos, 'errors': errors}
+
+
+@router.patch('/bulk', response_model=TodoBulkResult)
+@query_budget(6)
+async def update_todos_bulk(
+    bulk: TodoBulk,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+    settings: Settings = Depends(get_app_settings),
+):
+    _check_bulk_size(bulk.todos, settings)
+    valid, errors = _validate_bulk_items(bulk.todos, TodoBulkUpdate)
+
+    todos_database = {
+        todo.id: todo
+        for todo in await session.scalars(
+            select(Todo).where(
+                Todo.user_id == current_user.id,
+                Todo.id.in_([todo.id for _, todo in valid]),
+            )
+        )
+    }
+
+    updated = {}
+    for index, todo in valid:
+        todo_database = todos_database.get(todo.id)
+        if not todo_database:
+            errors.append({'index': index, 'detail': 'Not Found'})
+        elif todo.id in updated:
+            errors.append({'index': index, 'detail': 'Duplicate id'})
+        else:
+            updated[todo.id] = {
+                'id': todo.id,
+                **_todo_update_values(todo_database, todo),
+            }
+
+    if updated:
+        version = await bump_todo_version(session, current_user.id)
+        # One executemany UPDATE by primary key; flushing modified objects
+        # would emit a statement per distinct set of changed columns.
+        # Counted first: the UPDATE below also refreshes the loaded todos.
+        await record_todo_changes(
+            session,
+            current_user.id,
+            [
+                (
+                    todo_state(todos_database[todo_id]),
+                    TodoState(
+                        values['status'],
+                        todos_database[todo_id].created_at,
+                        values['done_at'],
+                    ),
+                )
+                for todo_id, values in updated.items()
+            ],
+        )
+        await session.execute(
+            update(Todo),
+            [{**values, 'change_version': version} for values in updated.values()],
+        )
+    await session.commit()
+
+    if updated:
+        await response_cache.invalidate(current_user.id)
+        record_write(current_user.email)
+        # Reload once so server-side `updated_at` values come back in one query.
+        await session.scalars(
+            select(Todo)
+            .where(Todo.id.in_(updated))
+            .execution_options(populate_existing=True)
+        )
+        await todo_events.publish(
+            current_user.id,
+            'updated',
+            version,
+            todos=[todos_database[todo_id] for todo_id in updated],
+        )
+
+    return {
+        'todos': [todos_database[todo_id] for todo_id in updated],
+        'errors': sorted(errors, key=lambda error: error['index']),
+    }
+
 
-    return {'todos': todos}
+@router.delete('/bulk', response_model=TodoBulkDeleted)
+@query_budget(5)
+async def delete_todos_bulk(
+    bulk: TodoBulkIds,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+    settings: Settings = Depends(get_app_settings),
+):
+    _check_bulk_size(bulk.ids, settings)
+
+    ids = list(dict.fromkeys(bulk.ids))
+    deleted_rows = (
+        await session.execute(
+            delete(Todo)
+            .where(Todo.user_id == current_user.id, Todo.id.in_(ids))
+            .returning(Todo.id, Todo.status, Todo.created_at, Todo.done_at)
+        )
+    ).all()
+    deleted = {row.id for row in deleted_rows}
+    if deleted:
+        version = await bump_todo_version(session, current_user.id)
+        await session.execute(
+            insert(TodoTombstone),
+            [
+                {
+                    'user_id': current_user.id,
+                    'todo_id': todo_id,
+                    'change_version': version,
+                }
+                for todo_id in deleted
+            ],
+        )
+        await record_todo_changes(
+            session, current_user.id, [(todo_state(row), None) for row in deleted_rows]
+        )
+    await session.commit()
+    if deleted:
+        await response_cache.invalidate(current_user.id)
+        record_write(current_user.email)
+        await todo_events.publish(
+            current_user.id, 'deleted', version, ids=sorted(deleted)
+        )
+
+    return {
+        'deleted': [todo_id for todo_id in ids if todo_id in deleted],
+        'errors': [
+            {'index': index, 'detail': 'Not Found'}
+            for index, todo_id in enumerate(bulk.ids)
+            if todo_id not in deleted
+        ],
+    }
+
+
+@router.get('/{todo_id}', response_model=TodoPublic)
+@query_budget(1)
+async def read_todo(
+    todo_id: int,
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+):
+    todo = await session.scalar(
+        select(Todo).where(Todo.user_id == current_user.id, Todo.id == todo_id)
+    )
+    if not todo:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Not Found')
+
+    last_modified = http_date(todo.updated_at)
+    if not_modified_since(request, todo.updated_at):
+        return Response(
+            status_code=HTTPStatus.NOT_MODIFIED,
+            headers={'Last-Modified': last_modified},
+        )
+    response.headers['Last-Modified'] = last_modified
+
+    return todo
 
 
 @router.put('/{todo_id}', response_model=TodoPublic)
-def update_todo(
+@query_budget(6)
+async def update_todo(
     todo_id: int,
     todo: TodoSchema,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ):
-    todo_database = session.scalar(
+    todo_database = await session.scalar(
         select(Todo).where(Todo.user_id == current_user.id, Todo.id == todo_id)
     )
 
     if not todo_database:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Not Found')
 
-    todo_database.title = todo.title
-    todo_database.description = todo.description
-    todo_database.status = todo.status
-
-    if todo_database.status == TodoStatus.done and todo_database.done_at is None:
-        todo_database.done_at = datetime.utcnow()
-
-    if todo_database.status != TodoStatus.done and todo_database.done_at is not None:
-        todo_database.done_at = None
+    values = _todo_update_values(todo_database, todo)
+    # Bumped and counted first: the autoflush of either would otherwise send
+    # the changes below as a separate UPDATE.
+    version = await bump_todo_version(session, current_user.id)
+    await record_todo_changes(
+        session,
+        current_user.id,
+        [
+            (
+                todo_state(todo_database),
+                TodoState(
+                    values['status'], todo_database.created_at, values['done_at']
+                ),
+            )
+        ],
+    )
+    for name, value in values.items():
+        setattr(todo_database, name, value)
+    todo_database.change_version = version
 
-    session.commit()
-    session.refresh(todo_database)
+    await session.commit()
+    await response_cache.invalidate(current_user.id)
+    record_write(current_user.email)
+    await session.refresh(todo_database)
+    await todo_events.publish(
+        current_user.id, 'updated', version, todos=[todo_database]
+    )
 
     return todo_database
 
 
 @router.delete('/{todo_id}', response_model=Message)
-def delete_todo(
+@query_budget(6)
+async def delete_todo(
     todo_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ):
-    todo = session.scalar(
+    todo = await session.scalar(
         select(Todo).where(Todo.user_id == current_user.id, Todo.id == todo_id)
     )
     if not todo:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Not Found')
 
-    session.delete(todo)
-    session.commit()
+    await session.delete(todo)
+    version = await bump_todo_version(session, current_user.id)
+    session.add(
+        TodoTombstone(user_id=current_user.id, todo_id=todo_id, change_version=version)
+    )
+    await record_todo_changes(session, current_user.id, [(todo_state(todo), None)])
+    await session.commit()
+    await response_cache.invalidate(current_user.id)
+    record_write(current_user.email)
+    await todo_events.publish(current_user.id, 'deleted', version, ids=[todo_id])
 
     return {'message': 'Task has been deleted successfully'}
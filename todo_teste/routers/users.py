@@ -1,20 +1,40 @@
 from http import HTTPStatus
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from todo_teste.database import get_session
-from todo_teste.models import User
+from todo_teste.hashing import HashingService, get_hashing_service
+from todo_teste.instrumentation import query_budget
+from todo_teste.models import (
+    Todo,
+    TodoCounts,
+    TodoDoneDay,
+    TodoTombstone,
+    TodoVersion,
+    User,
+)
+from todo_teste.replicas import get_read_session, record_write
+from todo_teste.response_cache import response_cache
 from todo_teste.schemas import Message, UserList, UserPublic, UserSchema
-from todo_teste.security import get_current_user, get_password_hash
+from todo_teste.security import get_current_user, user_cache
+from todo_teste.serialization import USER_COLUMNS, user_list_json
 
 router = APIRouter(prefix='/users', tags=['users'])
 
+# Tables with rows owned by a user, deleted along with it.
+USER_TABLES = (Todo, TodoTombstone, TodoVersion, TodoCounts, TodoDoneDay)
+
 
 @router.post('/', status_code=HTTPStatus.CREATED, response_model=UserPublic)
-def create_user(user: UserSchema, session: Session = Depends(get_session)):
-    user_database = session.scalar(
+@query_budget(3)
+async def create_user(
+    user: UserSchema,
+    session: AsyncSession = Depends(get_session),
+    hashing_service: HashingService = Depends(get_hashing_service),
+):
+    user_database = await session.scalar(
         select(User).where(
             (User.username == user.username) | (User.email == user.email)
         )
@@ -34,52 +54,64 @@ def create_user(user: UserSchema, session: Session = Depends(get_session)):
     user_database = User(
         username=user.username,
         email=user.email,
-        password=get_password_hash(user.password),
+        password=await hashing_service.hash(user.password),
     )
 
     session.add(user_database)
-    session.commit()
-    session.refresh(user_database)
+    await session.commit()
+    await session.refresh(user_database)
+    # Its first reads may come before the replicas have the user.
+    record_write(user_database.email)
 
     return user_database
 
 
 @router.get('/', response_model=UserList)
-def read_users(
+@query_budget(1)
+async def read_users(
     skip: int = 0,
     limit=100,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
-    users = session.scalars(select(User).offset(skip).limit(limit)).all()
-    return {'users': users}
+    rows = await session.execute(select(*USER_COLUMNS).offset(skip).limit(limit))
+    return Response(user_list_json(rows.all()), media_type='application/json')
 
 
 @router.put('/{user_id}', response_model=UserPublic)
-def update_user(
+@query_budget(3)
+async def update_user(
     user_id: int,
     user: UserSchema,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
+    hashing_service: HashingService = Depends(get_hashing_service),
 ):
     if current_user.id != user_id:
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permission'
         )
 
-    current_user.username = user.username
-    current_user.email = user.email
-    current_user.password = get_password_hash(user.password)
+    user_database = await session.get(User, current_user.id)
+    if not user_database:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Not Found')
 
-    session.commit()
-    session.refresh(current_user)
+    user_database.username = user.username
+    user_database.email = user.email
+    user_database.password = await hashing_service.hash(user.password)
 
-    return current_user
+    await session.commit()
+    await session.refresh(user_database)
+    user_cache.pop(current_user.email)
+    record_write(current_user.email, user_database.email)
+
+    return user_database
 
 
 @router.delete('/{user_id}', response_model=Message)
-def delete_user(
+@query_budget(2 + len(USER_TABLES))
+async def delete_user(
     user_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ):
     if current_user.id != user_id:
@@ -87,7 +119,16 @@ def delete_user(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permission'
         )
 
-    session.delete(current_user)
-    session.commit()
+    user_database = await session.get(User, current_user.id)
+    if not user_database:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Not Found')
+
+    for table in USER_TABLES:
+        await session.execute(delete(table).where(table.user_id == current_user.id))
+    await session.delete(user_database)
+    await session.commit()
+    user_cache.pop(current_user.email)
+    record_write(current_user.email)
+    await response_cache.invalidate(current_user.id)
 
     return {'message': 'User deleted!'}
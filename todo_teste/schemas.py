@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import Any, Literal
 
 from pydantic import BaseModel, ConfigDict, EmailStr
 
@@ -45,13 +46,75 @@ class TodoPublic(TodoSchema):
     done_at: datetime | None
 
 
+class TodoBulkUpdate(TodoSchema):
+    id: int
+
+
+class TodoBulk(BaseModel):
+    todos: list[dict[str, Any]]
+
+
+class TodoBulkIds(BaseModel):
+    ids: list[int]
+
+
+class BulkError(BaseModel):
+    index: int
+    detail: Any
+
+
+class TodoBulkResult(BaseModel):
+    todos: list[TodoPublic]
+    errors: list[BulkError]
+
+
+class TodoBulkDeleted(BaseModel):
+    deleted: list[int]
+    errors: list[BulkError]
+
+
+class ImportLineError(BaseModel):
+    line: int
+    detail: Any
+
+
+class TodoImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: list[ImportLineError]
+
+
 class TodoList(BaseModel):
     todos: list[TodoPublic]
+    next_cursor: str | None = None
+
+
+class TodoChanges(BaseModel):
+    todos: list[TodoPublic]
+    deleted: list[int]
+    watermark: str
+
+
+class TodoDayCount(BaseModel):
+    day: date
+    count: int
+
+
+class TodoStats(BaseModel):
+    total: int
+    by_status: dict[TodoStatus, int]
+    completed_per_day: list[TodoDayCount]
+    average_seconds_to_done: float | None
 
 
 class TodoFilters(BaseModel):
     title: str | None = None
     description: str | None = None
     status: TodoStatus | None = None
+    order_by: (
+        Literal['id', 'created_at', 'updated_at', 'done_at', 'title', 'status'] | None
+    ) = None
+    direction: Literal['asc', 'desc'] = 'asc'
     offset: int | None = 0
     limit: int | None = 100
+    cursor: str | None = None
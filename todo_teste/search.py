@@ -0,0 +1,75 @@
+import re
+
+from sqlalchemy import column, desc, func, literal_column, table
+
+from todo_teste.models import Todo
+from todo_teste.schemas import TodoFilters
+
+todo_fts = table('todo_fts', column('rowid'))
+# Inlined rather than bound, so the expression matches the GIN indexes'
+# `to_tsvector('simple', ...)` under server-side prepared statements.
+TS_CONFIG = literal_column("'simple'")
+
+SEARCH_COLUMNS = {'title': Todo.title, 'description': Todo.description}
+
+
+def search_terms(text: str) -> list[str]:
+    return re.findall(r'\w+', text)
+
+
+def _fts5_query(terms_by_column: dict[str, list[str]]) -> str:
+    # Terms are quoted so words like NOT or NEAR stay literal, and
+    # prefix-matched so partial-word filters like `?title=rep` keep working.
+    clauses = []
+    for name, terms in terms_by_column.items():
+        phrases = ' AND '.join(f'"{term}"*' for term in terms)
+        clauses.append(f'{name} : ({phrases})')
+    return ' AND '.join(clauses)
+
+
+def _tsquery(terms: list[str]) -> str:
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def apply_text_search(query, filters: TodoFilters, dialect_name: str, mode: str):
+    """Apply the title/description filters of `filters` to `query`.
+
+    `mode` is a `TODO_SEARCH_MODE`. Returns the filtered query and, when a
+    full-text index served the filters, a relevance ordering to sort by
+    (None otherwise).
+    """
+    terms_by_column = {}
+    for name, todo_column in SEARCH_COLUMNS.items():
+        value = getattr(filters, name)
+        if not value:
+            continue
+
+        terms = search_terms(value)
+        if mode == 'fulltext' and terms:
+            terms_by_column[name] = terms
+        else:
+            query = query.where(todo_column.contains(value))
+
+    if not terms_by_column:
+        return query, None
+
+    if dialect_name == 'sqlite':
+        query = query.join(todo_fts, todo_fts.c.rowid == Todo.id).where(
+            literal_column('todo_fts').op('MATCH')(_fts5_query(terms_by_column))
+        )
+        # bm25() is lower for better matches; title hits weigh more.
+        return query, func.bm25(literal_column('todo_fts'), 10.0, 1.0)
+
+    if dialect_name == 'postgresql':
+        rank = None
+        for name, terms in terms_by_column.items():
+            vector = func.to_tsvector(TS_CONFIG, SEARCH_COLUMNS[name])
+            tsquery = func.to_tsquery(TS_CONFIG, _tsquery(terms))
+            query = query.where(vector.op('@@')(tsquery))
+            column_rank = func.ts_rank(vector, tsquery)
+            rank = column_rank if rank is None else rank + column_rank
+        return query, desc(rank)
+
+    for name in terms_by_column:
+        query = query.where(SEARCH_COLUMNS[name].contains(getattr(filters, name)))
+    return query, None
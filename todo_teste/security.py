@@ -6,28 +6,28 @@ from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt import decode, encode
 from jwt.exceptions import PyJWTError
-from pwdlib import PasswordHash
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from todo_teste.database import get_session
+from todo_teste.cache import TTLCache
+from todo_teste.database import get_app_settings
+from todo_teste.instrumentation import unbudgeted
 from todo_teste.models import User
-from todo_teste.settings import Settings
+from todo_teste.replicas import get_read_session
+from todo_teste.schemas import UserPublic
+from todo_teste.serialization import USER_COLUMNS
+from todo_teste.settings import Settings, get_settings
 
-pwd_context = PasswordHash.recommended()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/token')
-settings = Settings()
 
+# Resolved users keyed by token subject, sized by `create_app`. Routes that
+# change or remove a user must pop its entry; the TTL bounds staleness
+# across workers.
+user_cache = TTLCache(maxsize=0, ttl=0)
 
-def get_password_hash(password: str):
-    return pwd_context.hash(password)
 
-
-def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def create_access_token(data: dict):
+def create_access_token(data: dict, settings: Settings | None = None):
+    settings = settings or get_settings()
     to_encode = data.copy()
 
     expire = datetime.now(tz=ZoneInfo('UTC')) + timedelta(
@@ -39,9 +39,14 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-def get_current_user(
-    session: Session = Depends(get_session),
+def user_claims(user: User) -> dict:
+    return {'sub': user.email, 'uid': user.id, 'username': user.username}
+
+
+async def get_current_user(
+    session: AsyncSession = Depends(get_read_session),
     token: str = Depends(oauth2_scheme),
+    settings: Settings = Depends(get_app_settings),
 ):
     credentials_exception = HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
@@ -56,8 +61,24 @@ def get_current_user(
     except PyJWTError:
         raise credentials_exception
 
-    user = session.scalar(select(User).where(User.email == id_user))
+    if settings.AUTH_TRUST_TOKEN_CLAIMS and 'uid' in payload:
+        return UserPublic.model_construct(
+            id=payload['uid'], username=payload.get('username'), email=id_user
+        )
+
+    user = user_cache.get(id_user)
     if user is None:
-        raise credentials_exception
+        # Only cache misses run this, so routes budget for a warm cache.
+        with unbudgeted():
+            row = (
+                await session.execute(
+                    select(*USER_COLUMNS).where(User.email == id_user)
+                )
+            ).first()
+        if row is None:
+            raise credentials_exception
+
+        user = UserPublic.model_validate(row)
+        user_cache.set(id_user, user)
 
     return user
@@ -0,0 +1,38 @@
+"""JSON bodies built straight from row tuples, without a pydantic pass."""
+
+import orjson
+
+from todo_teste.models import Todo, User
+from todo_teste.schemas import TodoPublic, UserPublic
+
+TODO_FIELDS = tuple(TodoPublic.model_fields)
+TODO_COLUMNS = tuple(getattr(Todo, field) for field in TODO_FIELDS)
+USER_FIELDS = tuple(UserPublic.model_fields)
+USER_COLUMNS = tuple(getattr(User, field) for field in USER_FIELDS)
+
+
+def todo_list_json(rows, next_cursor: str | None) -> bytes:
+    """Serialize a `TodoList` from rows selected as `TODO_COLUMNS`.
+
+    The rows come from the database already shaped like `TodoPublic`, so
+    validating them again only costs time; the output is byte-for-byte what
+    `TodoList(...).model_dump_json()` would produce.
+    """
+    return orjson.dumps({
+        'todos': [dict(zip(TODO_FIELDS, row)) for row in rows],
+        'next_cursor': next_cursor,
+    })
+
+
+def todo_changes_json(rows, deleted: list[int], watermark: str) -> bytes:
+    """Serialize `TodoChanges` from rows selected as `TODO_COLUMNS`."""
+    return orjson.dumps({
+        'todos': [dict(zip(TODO_FIELDS, row)) for row in rows],
+        'deleted': deleted,
+        'watermark': watermark,
+    })
+
+
+def user_list_json(rows) -> bytes:
+    """Serialize a `UserList` from rows selected as `USER_COLUMNS`."""
+    return orjson.dumps({'users': [dict(zip(USER_FIELDS, row)) for row in rows]})
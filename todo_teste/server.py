@@ -0,0 +1,51 @@
+"""Production entry point: uvicorn with one worker process per CPU."""
+
+import os
+
+import uvicorn
+
+from todo_teste.settings import Settings
+
+
+def worker_count(settings: Settings) -> int:
+    return settings.SERVER_WORKERS or os.cpu_count() or 1
+
+
+def uvicorn_options(settings: Settings) -> dict:
+    return {
+        'host': settings.SERVER_HOST,
+        'port': settings.SERVER_PORT,
+        'workers': worker_count(settings),
+        'loop': settings.SERVER_LOOP,
+        'http': settings.SERVER_HTTP,
+        'backlog': settings.SERVER_BACKLOG,
+        'timeout_keep_alive': settings.SERVER_KEEPALIVE_TIMEOUT,
+        'timeout_graceful_shutdown': settings.SERVER_GRACEFUL_TIMEOUT,
+        'limit_concurrency': settings.SERVER_LIMIT_CONCURRENCY,
+        'proxy_headers': settings.SERVER_PROXY_HEADERS,
+        'forwarded_allow_ips': settings.SERVER_FORWARDED_ALLOW_IPS,
+        'access_log': settings.SERVER_ACCESS_LOG,
+    }
+
+
+def hashing_workers_env(settings: Settings) -> dict[str, str]:
+    """Split the CPUs between server workers' password hashing pools.
+
+    Each server worker starts its own pool, sized to the CPU count by
+    default, which would oversubscribe the machine `workers` times over.
+    """
+    if settings.PASSWORD_HASH_WORKERS is not None:
+        return {}
+    per_worker = max((os.cpu_count() or 1) // worker_count(settings), 1)
+    return {'PASSWORD_HASH_WORKERS': str(per_worker)}
+
+
+def main():
+    settings = Settings()
+    # Workers are new processes that read `Settings` from the environment.
+    os.environ.update(hashing_workers_env(settings))
+    uvicorn.run('todo_teste.app:create_app', factory=True, **uvicorn_options(settings))
+
+
+if __name__ == '__main__':
+    main()
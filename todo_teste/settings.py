@@ -1,10 +1,76 @@
+from functools import lru_cache
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str = 'sqlite:///database.db'
+    DATABASE_MODE: Literal['async', 'sync'] = 'async'
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_POOL_RECYCLE: int = -1
+    READ_REPLICA_URLS: list[str] = []
+    READ_REPLICA_RETRY_AFTER: float = 30
+    READ_YOUR_WRITES_SECONDS: float = 5
+    READ_YOUR_WRITES_SIZE: int = 1024
+    SQLITE_JOURNAL_MODE: str = 'WAL'
+    SQLITE_SYNCHRONOUS: str = 'NORMAL'
+    SQLITE_CACHE_SIZE: int = -64000
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_BUSY_TIMEOUT: int = 5000
+    SQLITE_TEMP_STORE: str = 'MEMORY'
+    TODO_BULK_MAX_ITEMS: int = 1000
+    TODO_EXPORT_BATCH_SIZE: int = 1000
+    TODO_IMPORT_BATCH_SIZE: int = 1000
+    TODO_IMPORT_MAX_ERRORS: int = 100
+    TODO_LIST_CACHE_SIZE: int = 1024
+    TODO_LIST_CACHE_TTL: int = 30
+    TODO_STREAM_QUEUE_SIZE: int = 100
+    TODO_STREAM_KEEPALIVE: float = 15
+    TODO_SEARCH_MODE: Literal['fulltext', 'like'] = 'fulltext'
     SECRET_KEY: str = 'secret key'
     ALGORITHM: str = 'HS256'
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_TTL: int = 60
+    PASSWORD_HASH_EXECUTOR: Literal['process', 'thread'] = 'process'
+    PASSWORD_HASH_WORKERS: int | None = None
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    PASSWORD_HASH_RETRY_AFTER: int = 1
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PER_IP: str | None = None
+    RATE_LIMITS: dict[str, str] = {
+        'login_access_token': '10/minute',
+        'create_user': '10/minute',
+        'update_user': '30/minute',
+        'delete_user': '30/minute',
+        'import_todos': '30/minute',
+    }
+    RATE_LIMIT_STORE_SIZE: int = 100_000
+    SERVER_HOST: str = '0.0.0.0'
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int | None = None
+    SERVER_LOOP: Literal['auto', 'asyncio', 'uvloop'] = 'auto'
+    SERVER_HTTP: Literal['auto', 'h11', 'httptools'] = 'auto'
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_TIMEOUT: int = 5
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_LIMIT_CONCURRENCY: int | None = None
+    SERVER_PROXY_HEADERS: bool = True
+    SERVER_FORWARDED_ALLOW_IPS: str = '127.0.0.1'
+    SERVER_ACCESS_LOG: bool = False
+    THREADPOOL_SIZE: int = 40
+    METRICS_ENABLED: bool = False
+    QUERY_INSTRUMENTATION: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 100
 
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8')
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """The process-wide `Settings`, read from the environment on first use."""
+    return Settings()
@@ -0,0 +1,177 @@
+from datetime import datetime
+from http import HTTPStatus
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, literal, select, tuple_, union_all
+from sqlalchemy.dialects import sqlite
+
+from todo_teste.models import Todo, TodoStatus
+from todo_teste.pagination import decode_cursor, encode_cursor
+from todo_teste.schemas import TodoFilters
+
+# Each is covered by an index on (user_id, column, id), so a page is read
+# in index order. Ties are broken by id.
+SORT_COLUMNS = {
+    'id': Todo.id,
+    'created_at': Todo.created_at,
+    'updated_at': Todo.updated_at,
+    'done_at': Todo.done_at,
+    'title': Todo.title,
+    'status': Todo.status,
+}
+NULLABLE_SORT_COLUMNS = {'done_at'}
+
+# SQLite stores `func.now()` defaults as text without the microseconds
+# SQLAlchemy writes for Python datetimes; cursor values for those columns
+# must be written the same way to compare correctly.
+SERVER_TIMESTAMP = DateTime().with_variant(
+    sqlite.DATETIME(truncate_microseconds=True), 'sqlite'
+)
+BIND_TYPES = {'created_at': SERVER_TIMESTAMP, 'updated_at': SERVER_TIMESTAMP}
+
+
+def _sort_order(filters: TodoFilters) -> str:
+    return f'{filters.order_by or "id"}:{filters.direction}'
+
+
+def _invalid_cursor():
+    return HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor')
+
+
+def _cursor_value(value, order_by: str):
+    if value is None and order_by in NULLABLE_SORT_COLUMNS:
+        return None
+    try:
+        if order_by in {'created_at', 'updated_at', 'done_at'}:
+            return datetime.fromisoformat(value)
+        if order_by == 'status':
+            return TodoStatus(value)
+    except (TypeError, ValueError):
+        raise _invalid_cursor()
+    if not isinstance(value, str):
+        raise _invalid_cursor()
+    return value
+
+
+def cursor_position(filters: TodoFilters) -> tuple:
+    """The `(value, id)` of the last row of the previous page.
+
+    Cursors only resume the ordering they were issued for.
+    """
+    position = decode_cursor(filters.cursor)
+    if position.get('order', 'id:asc') != _sort_order(filters):
+        raise _invalid_cursor()
+    if not isinstance(position.get('id'), int):
+        raise _invalid_cursor()
+
+    order_by = filters.order_by or 'id'
+    if order_by == 'id':
+        return None, position['id']
+    return _cursor_value(position.get('value'), order_by), position['id']
+
+
+def next_cursor(row, filters: TodoFilters) -> str:
+    order_by = filters.order_by or 'id'
+    if _sort_order(filters) == 'id:asc':
+        # The cursor format from before sorting existed.
+        return encode_cursor({'id': row.id})
+
+    position = {'order': _sort_order(filters), 'id': row.id}
+    if order_by != 'id':
+        value = getattr(row, order_by)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, TodoStatus):
+            value = value.value
+        position['value'] = value
+    return encode_cursor(position)
+
+
+def _ordered(column, direction: str):
+    return column.desc() if direction == 'desc' else column.asc()
+
+
+def _after(columns, values, direction: str):
+    if len(columns) == 1:
+        return columns[0] < values[0] if direction == 'desc' else columns[0] > values[0]
+    # A row-value comparison, which both SQLite and Postgres answer with a
+    # range scan of the (user_id, column, id) index.
+    key = tuple_(*columns)
+    bound = tuple_(
+        *(
+            literal(value, BIND_TYPES.get(column.key, column.type))
+            for column, value in zip(columns, values)
+        )
+    )
+    return key < bound if direction == 'desc' else key > bound
+
+
+def apply_sort(query, filters: TodoFilters, position: tuple | None):
+    """Order and page `query` by `filters`.
+
+    With a `position` (see `cursor_position`) the page starts right after
+    it; otherwise `filters.offset` rows are skipped.
+    """
+    order_by, direction = filters.order_by or 'id', filters.direction
+    column = SORT_COLUMNS[order_by]
+
+    if order_by in NULLABLE_SORT_COLUMNS:
+        return _sort_nulls_last(query, column, filters, position)
+
+    if order_by == 'id':
+        if position is not None:
+            query = query.where(_after([Todo.id], [position[1]], direction))
+        query = query.order_by(_ordered(Todo.id, direction))
+    else:
+        if position is not None:
+            query = query.where(_after([column, Todo.id], position, direction))
+        query = query.order_by(
+            _ordered(column, direction), _ordered(Todo.id, direction)
+        )
+
+    if position is None:
+        query = query.offset(filters.offset)
+    return query.limit(filters.limit)
+
+
+def _sort_nulls_last(query, column, filters: TodoFilters, position: tuple | None):
+    """Order by a nullable column, todos without a value last either way.
+
+    Databases disagree on where NULLs go (first in SQLite, last in
+    Postgres), and forcing it with NULLS LAST makes them sort instead of
+    reading the index. So rows with and without a value are read in index
+    order by separate branches, each limited to the page, and only those
+    few rows are merged.
+    """
+    direction = filters.direction
+    offset = 0 if position is not None else filters.offset or 0
+    size = None if filters.limit is None else offset + filters.limit
+
+    with_value = query.where(column.is_not(None))
+    without_value = query.where(column.is_(None))
+    branches = []
+    if position is None or position[0] is not None:
+        if position is not None:
+            with_value = with_value.where(
+                _after([column, Todo.id], position, direction)
+            )
+        branches.append(
+            with_value.order_by(
+                _ordered(column, direction), _ordered(Todo.id, direction)
+            ).limit(size)
+        )
+    else:
+        without_value = without_value.where(_after([Todo.id], [position[1]], direction))
+    branches.append(without_value.order_by(_ordered(Todo.id, direction)).limit(size))
+
+    page = union_all(*(select(branch.subquery()) for branch in branches)).subquery()
+    return (
+        select(page)
+        .order_by(
+            page.c[column.key].is_(None),
+            _ordered(page.c[column.key], direction),
+            _ordered(page.c.id, direction),
+        )
+        .offset(offset)
+        .limit(filters.limit)
+    )
@@ -0,0 +1,194 @@
+"""Summary tables behind `GET /todo/stats`; `main` rebuilds them."""
+
+import argparse
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from todo_teste.database import create_database_engine, dispose_engine, open_session
+from todo_teste.models import Todo, TodoCounts, TodoDoneDay, TodoStatus
+from todo_teste.settings import get_settings
+from todo_teste.versions import UPSERT_DIALECTS
+
+COUNTERS = ('pending', 'running', 'done', 'completed', 'completed_seconds')
+
+
+class TodoState(NamedTuple):
+    status: TodoStatus
+    created_at: datetime | None
+    done_at: datetime | None
+
+
+def todo_state(todo) -> TodoState:
+    """The stats-relevant fields of a `Todo` or a row with those columns."""
+    return TodoState(todo.status, todo.created_at, todo.done_at)
+
+
+def _stats_delta(changes) -> tuple[dict, Counter]:
+    counts, days = dict.fromkeys(COUNTERS, 0), Counter()
+    for before, after in changes:
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            counts[TodoStatus(state.status).name] += sign
+            if state.status == TodoStatus.done and state.done_at is not None:
+                counts['completed'] += sign
+                counts['completed_seconds'] += (
+                    sign * (state.done_at - state.created_at).total_seconds()
+                )
+                days[state.done_at.date()] += sign
+    return counts, days
+
+
+async def record_todo_changes(session: AsyncSession, user_id: int, changes):
+    """Apply `changes` to `user_id`'s stats inside the caller's transaction.
+
+    `changes` holds a `(before, after)` pair of `TodoState` per todo
+    written, `before` being `None` for a new todo and `after` `None` for a
+    deleted one. Nothing is sent when the counters don't move, e.g. when
+    only a title changed.
+    """
+    counts, days = _stats_delta(changes)
+    upsert = UPSERT_DIALECTS.get(session.bind.dialect.name)
+
+    if any(counts.values()):
+        if upsert is not None:
+            statement = upsert(TodoCounts).values(user_id=user_id, **counts)
+            await session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[TodoCounts.user_id],
+                    set_={
+                        name: getattr(TodoCounts, name)
+                        + getattr(statement.excluded, name)
+                        for name in COUNTERS
+                    },
+                )
+            )
+        else:
+            result = await session.execute(
+                update(TodoCounts)
+                .where(TodoCounts.user_id == user_id)
+                .values({
+                    name: getattr(TodoCounts, name) + value
+                    for name, value in counts.items()
+                })
+            )
+            if not result.rowcount:
+                await session.execute(
+                    insert(TodoCounts).values(user_id=user_id, **counts)
+                )
+
+    days = {day: count for day, count in days.items() if count}
+    if days:
+        rows = [
+            {'user_id': user_id, 'day': day, 'count': count}
+            for day, count in sorted(days.items())
+        ]
+        if upsert is not None:
+            statement = upsert(TodoDoneDay)
+            await session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[TodoDoneDay.user_id, TodoDoneDay.day],
+                    set_={'count': TodoDoneDay.count + statement.excluded.count},
+                ),
+                rows,
+            )
+        else:
+            for row in rows:
+                result = await session.execute(
+                    update(TodoDoneDay)
+                    .where(
+                        TodoDoneDay.user_id == user_id, TodoDoneDay.day == row['day']
+                    )
+                    .values(count=TodoDoneDay.count + row['count'])
+                )
+                if not result.rowcount:
+                    await session.execute(insert(TodoDoneDay).values(row))
+
+
+def _seconds_to_done(dialect_name: str):
+    if dialect_name == 'sqlite':
+        # Julian days carry float error at the sub-millisecond scale.
+        return func.round(
+            (func.julianday(Todo.done_at) - func.julianday(Todo.created_at)) * 86400, 3
+        )
+    return func.extract('epoch', Todo.done_at - Todo.created_at)
+
+
+async def rebuild_todo_stats(session: AsyncSession, user_id: int | None = None):
+    """Recompute the stats of `user_id`, or of every user, from `todo`.
+
+    Runs in the caller's transaction; commit afterwards. Writes committed
+    while it runs on another connection may be lost from the counters, so
+    rebuild when the user's todos are quiet.
+    """
+    completed = (Todo.status == TodoStatus.done) & Todo.done_at.is_not(None)
+    todos = select(Todo.user_id)
+    if user_id is not None:
+        todos = todos.where(Todo.user_id == user_id)
+        await session.execute(delete(TodoCounts).where(TodoCounts.user_id == user_id))
+        await session.execute(delete(TodoDoneDay).where(TodoDoneDay.user_id == user_id))
+    else:
+        await session.execute(delete(TodoCounts))
+        await session.execute(delete(TodoDoneDay))
+
+    await session.execute(
+        insert(TodoCounts).from_select(
+            ['user_id', *COUNTERS],
+            todos.add_columns(
+                *(
+                    func.sum(case((Todo.status == status, 1), else_=0))
+                    for status in (
+                        TodoStatus.pending,
+                        TodoStatus.running,
+                        TodoStatus.done,
+                    )
+                ),
+                func.sum(case((completed, 1), else_=0)),
+                func.coalesce(
+                    func.sum(
+                        case(
+                            (completed, _seconds_to_done(session.bind.dialect.name)),
+                            else_=0,
+                        )
+                    ),
+                    0,
+                ),
+            ).group_by(Todo.user_id),
+        )
+    )
+    day = func.date(Todo.done_at)
+    await session.execute(
+        insert(TodoDoneDay).from_select(
+            ['user_id', 'day', 'count'],
+            todos
+            .add_columns(day, func.count())
+            .where(completed)
+            .group_by(Todo.user_id, day),
+        )
+    )
+
+
+async def _rebuild(user_id: int | None):
+    engine = create_database_engine(get_settings())
+    try:
+        async with open_session(engine) as session:
+            await rebuild_todo_stats(session, user_id)
+            await session.commit()
+    finally:
+        await dispose_engine(engine)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the todo statistics.')
+    parser.add_argument('--user-id', type=int, help='only this user')
+    args = parser.parse_args()
+    asyncio.run(_rebuild(args.user_id))
+
+
+if __name__ == '__main__':
+    main()
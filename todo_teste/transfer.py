@@ -0,0 +1,196 @@
+"""Incremental NDJSON/CSV encoding and decoding for todo export and import."""
+
+import codecs
+import csv
+import io
+import json
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from datetime import datetime
+
+from pydantic import ValidationError
+
+from todo_teste.models import TodoStatus
+from todo_teste.schemas import TodoPublic, TodoSchema
+
+EXPORT_FIELDS = list(TodoPublic.model_fields)
+MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, TodoStatus):
+        return value.value
+    return value
+
+
+def encode_rows(rows: Iterable, transfer_format: str) -> str:
+    """Encode rows ordered like `EXPORT_FIELDS` as NDJSON lines or CSV."""
+    if transfer_format == 'csv':
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            ['' if value is None else _export_value(value) for value in row]
+            for row in rows
+        )
+        return buffer.getvalue()
+
+    return ''.join(
+        json.dumps(
+            {field: _export_value(value) for field, value in zip(EXPORT_FIELDS, row)},
+            ensure_ascii=False,
+        )
+        + '\n'
+        for row in rows
+    )
+
+
+# Longest line an upload may have. Longer lines are skipped and reported, so
+# a body without newlines is never buffered whole.
+MAX_LINE_LENGTH = 64 * 1024
+LINE_TOO_LONG = f'Line longer than {MAX_LINE_LENGTH} characters'
+
+
+async def _lines(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[int, str | None]]:
+    """Yield `(number, line)`, with `line` None when it is too long."""
+    # 'utf-8-sig' drops the byte order mark spreadsheets put before a header.
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    too_long = False
+    number = 0
+
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            number += 1
+            too_long = too_long or len(line) > MAX_LINE_LENGTH
+            yield number, None if too_long else line.rstrip('\r')
+            too_long = False
+        if len(buffer) > MAX_LINE_LENGTH:
+            # Drop what was read; the rest of the line is skipped as it arrives.
+            too_long, buffer = True, ''
+
+    buffer += decoder.decode(b'', final=True)
+    too_long = too_long or len(buffer) > MAX_LINE_LENGTH
+    if buffer or too_long:
+        yield number + 1, None if too_long else buffer.rstrip('\r')
+
+
+# Lines a quoted CSV field may span before the record is rejected, so an
+# unbalanced quote can't make the rest of the upload one record.
+CSV_MAX_RECORD_LINES = 100
+
+
+class _NeedMoreLines(Exception):
+    pass
+
+
+class _PendingLines:
+    """Lines fed to `csv.reader`, asking for more instead of ending."""
+
+    def __init__(self):
+        self.lines = deque()
+        self.position = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.position == len(self.lines):
+            raise _NeedMoreLines
+        self.position += 1
+        return self.lines[self.position - 1][1] + '\n'
+
+
+def _parse_pending(reader, pending: _PendingLines, final: bool):
+    # The reader starts each record afresh, so a record that needs more lines
+    # is parsed again from its first line once they arrive.
+    while pending.lines:
+        start = pending.lines[0][0]
+        pending.position = 0
+        try:
+            values = next(reader)
+        except _NeedMoreLines:
+            if not final and len(pending.lines) < CSV_MAX_RECORD_LINES:
+                return
+            yield start, None, 'Unterminated quoted field'
+            consumed = 1
+        except csv.Error as exc:
+            yield start, None, str(exc)
+            consumed = max(pending.position, 1)
+        else:
+            if values:
+                yield start, values, None
+            consumed = pending.position
+
+        for _ in range(consumed):
+            pending.lines.popleft()
+
+
+async def _csv_records(
+    lines: AsyncIterator[tuple[int, str | None]],
+) -> AsyncIterator[tuple[int, list[str] | None, str | None]]:
+    pending = _PendingLines()
+    reader = csv.reader(pending)
+    async for number, line in lines:
+        if line is None:
+            # No record continues across a skipped line.
+            for record in _parse_pending(reader, pending, final=True):
+                yield record
+            yield number, None, LINE_TOO_LONG
+            continue
+
+        pending.lines.append((number, line))
+        for record in _parse_pending(reader, pending, final=False):
+            yield record
+
+    for record in _parse_pending(reader, pending, final=True):
+        yield record
+
+
+def _validation_detail(exc: ValidationError):
+    return exc.errors(include_url=False, include_context=False, include_input=False)
+
+
+async def parse_todos(
+    chunks: AsyncIterable[bytes], transfer_format: str
+) -> AsyncIterator[tuple[int, TodoSchema | None, object]]:
+    """Yield `(line, todo, error)` for each record of an upload as it arrives.
+
+    Exactly one of `todo` and `error` is set. Only one record is held in
+    memory at a time, whatever the size of the upload.
+    """
+    if transfer_format == 'ndjson':
+        async for number, line in _lines(chunks):
+            if line is None:
+                yield number, None, LINE_TOO_LONG
+                continue
+            if not line.strip():
+                continue
+            try:
+                yield number, TodoSchema.model_validate_json(line), None
+            except ValidationError as exc:
+                yield number, None, _validation_detail(exc)
+        return
+
+    header = None
+    async for number, values, error in _csv_records(_lines(chunks)):
+        if error is not None:
+            yield number, None, error
+            continue
+
+        if header is None:
+            header = values
+            continue
+
+        if len(values) != len(header):
+            yield number, None, f'Expected {len(header)} fields, got {len(values)}'
+            continue
+
+        try:
+            yield number, TodoSchema.model_validate(dict(zip(header, values))), None
+        except ValidationError as exc:
+            yield number, None, _validation_detail(exc)
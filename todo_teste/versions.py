@@ -0,0 +1,45 @@
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from todo_teste.models import TodoVersion
+
+UPSERT_DIALECTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+async def bump_todo_version(session: AsyncSession, user_id: int) -> int:
+    """Bump `user_id`'s todo version inside the caller's transaction.
+
+    Call it before writing to the user's todos and stamp the written rows'
+    `change_version` with the returned version. The bump locks the user's
+    version row until commit, so versions become visible in order.
+    """
+    upsert = UPSERT_DIALECTS.get(session.bind.dialect.name)
+    if upsert is not None:
+        return await session.scalar(
+            upsert(TodoVersion)
+            .values(user_id=user_id, version=1)
+            .on_conflict_do_update(
+                index_elements=[TodoVersion.user_id],
+                set_={'version': TodoVersion.version + 1},
+            )
+            .returning(TodoVersion.version)
+        )
+
+    result = await session.execute(
+        update(TodoVersion)
+        .where(TodoVersion.user_id == user_id)
+        .values(version=TodoVersion.version + 1)
+    )
+    if not result.rowcount:
+        session.add(TodoVersion(user_id=user_id, version=1))
+        await session.flush()
+        return 1
+    return await get_todo_version(session, user_id)
+
+
+async def get_todo_version(session: AsyncSession, user_id: int) -> int:
+    version = await session.scalar(
+        select(TodoVersion.version).where(TodoVersion.user_id == user_id)
+    )
+    return version or 0